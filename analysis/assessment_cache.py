@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def model_specs_key(model_specs):
+    """Canonical cache key for a model's assessment inputs
+
+    The model name is left out since it does not affect the result, so
+    identically specified models share an entry. Capabilities and
+    evaluations are order- and duplicate-insensitive.
+    """
+    parameters = model_specs.parameters
+    return (float(model_specs.training_compute_flops),
+            None if parameters is None else float(parameters),
+            tuple(sorted(set(model_specs.capabilities))),
+            tuple(sorted(set(model_specs.passed_evaluations))))
+
+
+def data_version(*datasets):
+    """Short content hash identifying a set of loaded JSON datasets"""
+    digest = hashlib.sha256()
+    for data in datasets:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+class AssessmentCache:
+    """Thread-safe bounded LRU of assessments tagged with a data version
+
+    Entries are only valid for the data version they were stored under; a
+    lookup or store with a different version drops everything first.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version):
+        """Store a value, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'data_version': self.version
+            }
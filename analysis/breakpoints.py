@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from analysis.tier_index import BELOW_THRESHOLD
+
+EU_SOURCE = "EU AI Act"
+EU_SYSTEMIC_RISK = "Systemic risk"
+
+
+class ComputeSweep:
+    """Every tier each framework assigns as training compute grows
+
+    initial maps each source (framework name, plus the EU AI Act) to its
+    (tier, tier_level) at zero compute. breakpoints has one row per change,
+    sorted by flops: from that compute upwards, source is assessed as tier.
+    """
+
+    def __init__(self, initial, breakpoints):
+        self.initial = initial
+        self.breakpoints = breakpoints
+
+    @property
+    def flops(self):
+        """Sorted distinct compute values at which any assessment changes"""
+        return np.unique(self.breakpoints['flops'].to_numpy())
+
+    def tiers_at(self, flops):
+        """Tier of every source for a model trained with the given compute"""
+        tiers = {source: tier for source, (tier, _) in self.initial.items()}
+        reached = self.breakpoints[self.breakpoints['flops'] <= flops]
+        tiers.update(zip(reached['source'], reached['tier']))
+        return tiers
+
+    def step_series(self, start=1e22, stop=1e28):
+        """Long-format step function of each source over a compute range
+
+        Each source gets a point at start, one at every breakpoint inside
+        the range and one at stop, ready for a line chart with hv shape.
+        """
+        rows = []
+        for source, (tier, level) in self.initial.items():
+            changes = self.breakpoints[self.breakpoints['source'] == source]
+            before = changes[changes['flops'] <= start]
+            if len(before):
+                tier, level = before.iloc[-1][['tier', 'tier_level']]
+            rows.append((source, start, tier, level))
+            inside = changes[(changes['flops'] > start) &
+                             (changes['flops'] <= stop)]
+            for flops, tier, level in inside[['flops', 'tier',
+                                              'tier_level']].itertuples(
+                                                  index=False):
+                rows.append((source, flops, tier, level))
+            rows.append((source, stop, tier, level))
+        return pd.DataFrame(rows,
+                            columns=['source', 'flops', 'tier', 'tier_level'])
+
+
+def compute_sweep(tier_index, capabilities=(), eu_threshold=1e25):
+    """Derive exact compute breakpoints for a fixed capability set
+
+    Within a framework, the tier reached by compute alone only moves at the
+    distinct values of its running-minimum thresholds, and capability
+    matches put a floor under it. Each framework therefore contributes at
+    most one event per tier, and the sweep is a sort of those events.
+    """
+    capability_positions = tier_index.capability_positions(capabilities)
+
+    # Frameworks sharing a name resolve like assess_model: the last one
+    # with a named tier wins
+    groups = {}
+    for i, framework in enumerate(tier_index.frameworks):
+        groups.setdefault(framework.name, []).append(i)
+    group_order = {name: order for order, name in enumerate(groups)}
+
+    positions = capability_positions.tolist()
+    events = []
+    for i, framework in enumerate(tier_index.frameworks):
+        previous = None
+        for position, neg_flops in enumerate(framework.neg_min_flops):
+            flops = -neg_flops
+            if flops == previous or flops == np.inf:
+                continue
+            previous = flops
+            if position < positions[i]:
+                events.append((flops, i, position))
+    events.sort(key=lambda event: event[0])
+
+    def resolve(name):
+        value = None
+        for i in groups[name]:
+            framework = tier_index.frameworks[i]
+            position = positions[i]
+            if position >= len(framework):
+                value = (BELOW_THRESHOLD, 0.0)
+            elif framework.tier_names[position] is not None:
+                value = (framework.tier_names[position],
+                         framework.tier_levels[position])
+        return value
+
+    initial = {}
+    for name in groups:
+        value = resolve(name)
+        if value is not None:
+            initial[name] = value
+    initial[EU_SOURCE] = (BELOW_THRESHOLD, 0.0)
+
+    rows = []
+    current = dict(initial)
+    start = 0
+    while start < len(events):
+        flops = events[start][0]
+        end = start
+        touched = set()
+        while end < len(events) and events[end][0] == flops:
+            _, i, position = events[end]
+            positions[i] = position
+            touched.add(tier_index.frameworks[i].name)
+            end += 1
+        for name in sorted(touched, key=group_order.get):
+            value = resolve(name)
+            if value is not None and value != current.get(name):
+                current[name] = value
+                rows.append((flops, name) + value)
+        start = end
+
+    rows.append((float(eu_threshold), EU_SOURCE, EU_SYSTEMIC_RISK, 1.0))
+    breakpoints = pd.DataFrame(
+        rows, columns=['flops', 'source', 'tier', 'tier_level'])
+    breakpoints = breakpoints.sort_values('flops', kind='stable',
+                                          ignore_index=True)
+    return ComputeSweep(initial, breakpoints)
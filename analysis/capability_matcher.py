@@ -0,0 +1,132 @@
+import threading
+from collections import deque
+
+# Used when data/capability_taxonomy.json is missing. Each family lists the
+# terms that identify it in both a model's capabilities and a tier's
+# capability_threshold text.
+DEFAULT_TAXONOMY = {
+    "capability_families": {
+        "cbrn": ["cbrn"],
+        "cyber": ["cyber"],
+        "autonomy": ["autonom"],
+        "persuasion": ["persuasion"]
+    }
+}
+
+# Guards the phrase caches of every CapabilityMatcher
+_phrase_tiers_lock = threading.Lock()
+
+
+class TermAutomaton:
+    """Aho-Corasick automaton reporting which terms occur in a text"""
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [set()]
+
+        for term_id, term in enumerate(self.terms):
+            state = 0
+            for char in term:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state].add(term_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+
+    def find(self, text):
+        """Ids of all terms occurring anywhere in text"""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._out[state]:
+                found |= self._out[state]
+        return found
+
+
+class CapabilityMatcher:
+    """Inverted index from capabilities to the tiers whose text they touch
+
+    A capability touches a tier when its phrase appears in the tier's
+    capability_threshold text, or when both mention a term from the same
+    taxonomy family. Family membership of every tier is resolved once at
+    build time with a single automaton pass per tier; phrase lookups are
+    resolved on first use and then served from a bounded cache.
+    """
+
+    PHRASE_CACHE_SIZE = 4096
+
+    def __init__(self, tier_texts, taxonomy=None, family_tiers=None):
+        """tier_texts are the lowercased capability_threshold of every tier
+
+        family_tiers, when given, is a previously computed family_tiers
+        mapping for the same texts and taxonomy, skipping the scan.
+        """
+        families = (taxonomy or DEFAULT_TAXONOMY).get('capability_families', {})
+        self.tier_texts = tier_texts
+
+        terms = []
+        self._term_family = []
+        for family, family_terms in families.items():
+            for term in family_terms:
+                terms.append(term.lower())
+                self._term_family.append(family)
+        self.automaton = TermAutomaton(terms)
+
+        # family -> ids of tiers whose threshold text mentions it
+        if family_tiers is None:
+            family_tiers = {family: set() for family in families}
+            for tier_id, text in enumerate(self.tier_texts):
+                for family in self.families(text):
+                    family_tiers[family].add(tier_id)
+        self.family_tiers = family_tiers
+
+        self._phrase_tiers = {}
+
+    def families(self, text):
+        """Taxonomy families mentioned in a lowercased text"""
+        return {self._term_family[i] for i in self.automaton.find(text)}
+
+    def phrase_tiers(self, capability):
+        """Ids of tiers touched by a single capability"""
+        phrase = capability.lower()
+        with _phrase_tiers_lock:
+            tiers = self._phrase_tiers.get(phrase)
+        if tiers is None:
+            tiers = {
+                tier_id for tier_id, text in enumerate(self.tier_texts)
+                if phrase in text
+            }
+            for family in self.families(phrase):
+                tiers |= self.family_tiers[family]
+            tiers = frozenset(tiers)
+            with _phrase_tiers_lock:
+                if phrase not in self._phrase_tiers and \
+                        len(self._phrase_tiers) >= self.PHRASE_CACHE_SIZE:
+                    del self._phrase_tiers[next(iter(self._phrase_tiers))]
+                self._phrase_tiers[phrase] = tiers
+        return tiers
+
+    def touched(self, capabilities):
+        """Ids of tiers touched by any capability in the set"""
+        tiers = set()
+        for capability in capabilities:
+            tiers |= self.phrase_tiers(capability)
+        return tiers
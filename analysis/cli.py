@@ -0,0 +1,154 @@
+"""Assess model specs streamed from JSONL or CSV, writing JSONL results
+
+Run from the repository root:
+
+    python -m analysis specs.jsonl > assessments.jsonl
+    cat model_cards.csv | python -m analysis --format csv --errors bad.jsonl
+
+Input is read and assessed chunk by chunk, so memory stays flat however
+large it is. Each output line is a RiskAssessment; rows that fail
+validation or give a non-finite compute are reported as
+{"line": ..., "error": ...} on stderr (or --errors) and skipped.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+from itertools import islice
+
+from pydantic import ValidationError
+
+from analysis.models import ModelSpecs
+from analysis.threshold_matcher import ThresholdMatcher
+
+CHUNK_SIZE = 1000
+
+# CSV columns holding lists, written as JSON lists or ;-separated values
+LIST_FIELDS = ('capabilities', 'passed_evaluations')
+
+
+def _csv_record(row):
+    record = {key: value for key, value in row.items()
+              if key is not None and value not in (None, '')}
+    for field in LIST_FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        value = value.strip()
+        record[field] = json.loads(value) if value.startswith('[') else [
+            item.strip() for item in value.split(';') if item.strip()
+        ]
+    return record
+
+
+def read_records(stream, input_format):
+    """Yield (line number, record dict or parse error) from a stream"""
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            try:
+                yield reader.line_num, _csv_record(row)
+            except ValueError as e:
+                yield reader.line_num, e
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+
+def _error_message(error):
+    if isinstance(error, ValidationError):
+        return '; '.join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'record'}: "
+            f"{item['msg']}" for item in error.errors())
+    return str(error)
+
+
+def assess_stream(matcher, records, output, errors, chunk_size=CHUNK_SIZE):
+    """Validate and assess records chunk by chunk, writing JSONL
+
+    Returns the number of models assessed and of records rejected.
+    """
+    assessed = rejected = 0
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        specs = []
+        for number, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                spec = ModelSpecs.model_validate(record)
+                if not math.isfinite(spec.training_compute_flops):
+                    raise ValueError(
+                        "training_compute_flops: must be finite, got "
+                        f"{spec.training_compute_flops}")
+                specs.append(spec)
+            except (ValidationError, ValueError) as e:
+                rejected += 1
+                errors.write(json.dumps({'line': number,
+                                         'error': _error_message(e)}) + '\n')
+        for assessment in matcher.assess_batch(specs):
+            output.write(assessment.model_dump_json() + '\n')
+        assessed += len(specs)
+    return assessed, rejected
+
+
+def _format_for(path, input_format):
+    if input_format:
+        return input_format
+    return 'csv' if path and path.lower().endswith('.csv') else 'jsonl'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', nargs='?', default='-',
+                        help='JSONL or CSV file of model specs (- for stdin)')
+    parser.add_argument('--format', dest='input_format',
+                        choices=['jsonl', 'csv'],
+                        help='input format (default: from the file name, '
+                        'else jsonl)')
+    parser.add_argument('--output', default='-',
+                        help='JSONL file to write (- for stdout)')
+    parser.add_argument('--errors', help='JSONL file for rejected records '
+                        '(default: stderr)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='models assessed per batch')
+    parser.add_argument('--root', default='.',
+                        help='repository root holding data/')
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error(f"--chunk-size must be at least 1, got {args.chunk_size}")
+
+    input_format = _format_for(None if args.input == '-' else args.input,
+                               args.input_format)
+    matcher = ThresholdMatcher(root=args.root)
+
+    source = sys.stdin if args.input == '-' else open(args.input, 'r',
+                                                      newline='')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    errors = sys.stderr if args.errors is None else open(args.errors, 'w')
+    try:
+        assessed, rejected = assess_stream(matcher,
+                                           read_records(source, input_format),
+                                           output, errors, args.chunk_size)
+    finally:
+        for stream in (source, output, errors):
+            if stream not in (sys.stdin, sys.stdout, sys.stderr):
+                stream.close()
+
+    print(f"✅ Assessed {assessed} models"
+          + (f", ⚠️ rejected {rejected}" if rejected else ""),
+          file=sys.stderr)
+    return 1 if rejected and not assessed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
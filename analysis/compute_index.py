@@ -0,0 +1,122 @@
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from analysis.breakpoints import EU_SOURCE
+from analysis.tier_index import _as_flops
+
+# Kinds of threshold held in the index
+EU_AI_ACT = 'eu_ai_act'
+REGULATION = 'regulation'
+FRAMEWORK = 'framework'
+
+
+class ComputeThresholdIndex:
+    """Every compute threshold from every source, sorted by FLOPs
+
+    Holds the EU AI Act systemic-risk threshold, each regime listed in
+    compute_thresholds.json and each framework tier's own
+    compute_threshold_flops. A model trained with c FLOPs crosses exactly
+    the thresholds <= c, which form a prefix of the sorted entries, so a
+    lookup is one bisect plus the k entries returned.
+    """
+
+    def __init__(self, entries, eu_threshold):
+        entries = sorted(entries, key=lambda entry: entry['flops'])
+        self.entries = entries
+        self.eu_threshold = eu_threshold
+        self.flops = np.array([entry['flops'] for entry in entries],
+                              dtype=np.float64)
+        self._flops = self.flops.tolist()
+
+    @classmethod
+    def build(cls, tier_index, eu_requirements, compute_thresholds):
+        """Collect thresholds from the loaded data files"""
+        eu_data = eu_requirements.get('eu_ai_act', {})
+        eu_threshold = float(eu_data.get('compute_threshold_flops', 1e25))
+        entries = [{
+            'flops': eu_threshold,
+            'kind': EU_AI_ACT,
+            'source': EU_SOURCE,
+            'tier': None,
+            'tier_level': None,
+            'triggers': list(eu_data.get('required_evaluations', [])),
+        }]
+
+        for regime in compute_thresholds.get('compute_thresholds', []):
+            flops = _as_flops(regime.get('threshold_flops'))
+            source = regime.get('source', 'Unknown')
+            # Already present as the EU AI Act entry
+            if flops is None or (source == EU_SOURCE and flops == eu_threshold):
+                continue
+            entries.append({
+                'flops': flops,
+                'kind': REGULATION,
+                'source': source,
+                'tier': None,
+                'tier_level': None,
+                'triggers': list(regime.get('triggers', [])),
+            })
+
+        for framework in tier_index.frameworks:
+            for name, level, flops in zip(framework.tier_names,
+                                          framework.tier_levels,
+                                          framework.tier_flops):
+                if flops != flops:  # nan: tier has no compute threshold
+                    continue
+                entries.append({
+                    'flops': flops,
+                    'kind': FRAMEWORK,
+                    'source': framework.name,
+                    'tier': name,
+                    'tier_level': level,
+                    'triggers': [],
+                })
+        return cls(entries, eu_threshold)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def crossed(self, flops):
+        """Thresholds a model trained with flops reaches, lowest first"""
+        return self.entries[:bisect_right(self._flops, flops)]
+
+    def next_threshold(self, flops):
+        """Lowest threshold above flops, or None"""
+        position = bisect_right(self._flops, flops)
+        return self.entries[position] if position < len(self.entries) else None
+
+    def crosses_eu_threshold(self, flops):
+        """Whether flops reaches the EU AI Act systemic-risk threshold"""
+        return flops >= self.eu_threshold
+
+    def crosses_eu_threshold_many(self, computes):
+        """crosses_eu_threshold for an array of compute values
+
+        NaN compute crosses nothing, as in the scalar comparison.
+        """
+        return np.asarray(computes, dtype=float) >= self.eu_threshold
+
+    def count_crossed(self, computes):
+        """Number of thresholds each of an array of compute values reaches"""
+        return np.searchsorted(self.flops, np.asarray(computes, dtype=float),
+                               side='right')
+
+    def crossed_many(self, computes) -> pd.DataFrame:
+        """Long table of (item, threshold) for every threshold crossed
+
+        item is the position of the compute value in computes; the other
+        columns are those of the entries.
+        """
+        counts = self.count_crossed(computes)
+        total = int(counts.sum())
+        items = np.repeat(np.arange(len(counts)), counts)
+        starts = np.cumsum(counts) - counts
+        positions = np.arange(total) - np.repeat(starts, counts)
+        table = pd.DataFrame(
+            [self.entries[i] for i in positions.tolist()],
+            columns=['flops', 'kind', 'source', 'tier', 'tier_level',
+                     'triggers'])
+        table.insert(0, 'item', items)
+        return table
@@ -0,0 +1,123 @@
+class StringPool:
+    """Deduplicates strings so repeated text is stored once
+
+    Extraction repeats the same evaluation, safeguard and restriction
+    sentences across tiers, frameworks and versions; json.load gives every
+    occurrence its own object.
+    """
+
+    def __init__(self):
+        self._strings = {}
+
+    def __len__(self):
+        return len(self._strings)
+
+    def intern(self, value):
+        """Return the pooled copy of a string (other values pass through)"""
+        if not isinstance(value, str):
+            return value
+        return self._strings.setdefault(value, value)
+
+    def intern_all(self, values):
+        """Pooled, immutable copy of a list of strings"""
+        if not isinstance(values, (list, tuple)):
+            return values
+        return tuple(self.intern(value) for value in values)
+
+
+_MISSING = object()
+
+
+class _Record:
+    """Read-only record with dict-style access
+
+    Fields absent from the source dict are left unset, so get() behaves
+    exactly like dict.get on the original JSON.
+    """
+
+    __slots__ = ('extra', )
+    _list_fields = ()
+
+    def __init__(self, data, pool):
+        extra = None
+        for key, value in data.items():
+            if key in self.__slots__:
+                if key in self._list_fields:
+                    value = pool.intern_all(value)
+                else:
+                    value = pool.intern(value)
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[pool.intern(key)] = value
+        object.__setattr__(self, 'extra', extra)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def get(self, key, default=None):
+        if key in self.__slots__ and key != 'extra':
+            return getattr(self, key, default)
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        """Plain JSON-compatible dict"""
+        data = {}
+        for key in self.__slots__:
+            if key == 'extra' or not hasattr(self, key):
+                continue
+            value = getattr(self, key)
+            if isinstance(value, tuple):
+                value = [
+                    item.to_dict() if isinstance(item, _Record) else item
+                    for item in value
+                ]
+            data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class TierRecord(_Record):
+    """One risk tier of a framework"""
+
+    __slots__ = ('tier_name', 'tier_level', 'capability_threshold',
+                 'compute_threshold_flops', 'evaluation_requirements',
+                 'required_safeguards', 'deployment_restrictions',
+                 'source_quote')
+    _list_fields = ('evaluation_requirements', 'required_safeguards',
+                    'deployment_restrictions')
+
+
+class FrameworkRecord(_Record):
+    """One extracted framework and its tiers"""
+
+    __slots__ = ('organization', 'framework_name', 'version', 'risk_tiers')
+
+    def __init__(self, data, pool):
+        tiers = data.get('risk_tiers')
+        super().__init__(
+            {key: value for key, value in data.items() if key != 'risk_tiers'},
+            pool)
+        if 'risk_tiers' in data:
+            object.__setattr__(
+                self, 'risk_tiers',
+                tuple(TierRecord(tier, pool) for tier in tiers or []))
+
+
+def compact_frameworks(frameworks, pool=None):
+    """Convert raw framework dicts to pooled, slotted records"""
+    pool = pool if pool is not None else StringPool()
+    return tuple(FrameworkRecord(framework, pool) for framework in frameworks)
@@ -0,0 +1,82 @@
+import threading
+
+from analysis.assessment_cache import data_version
+from analysis.compute_index import ComputeThresholdIndex
+from analysis.framework_store import StringPool, compact_frameworks
+from analysis.reverse_index import ReverseIndex
+from analysis.tier_index import TierIndex
+
+_frameworks_lock = threading.Lock()
+
+
+class MatcherData:
+    """Everything the matcher derives from one load of the data files
+
+    Never mutated after construction (bar the one-time lazy parse of
+    frameworks and build of the reverse index), so a reload can build a
+    new instance off to the side and swap it in with a single assignment.
+    Frameworks are kept as compact read-only records sharing one string
+    pool; the raw JSON dicts are dropped once compiled.
+    """
+
+    __slots__ = ('capability_taxonomy', 'eu_requirements', 'compute_thresholds',
+                 'tier_index', 'compute_index', 'version', '_frameworks',
+                 '_load_frameworks', '_pool', '_reverse_index')
+
+    def __init__(self, frameworks, capability_taxonomy, eu_requirements,
+                 compute_thresholds, pool=None):
+        self._pool = pool if pool is not None else StringPool()
+        self.version = data_version(frameworks, capability_taxonomy,
+                                    eu_requirements, compute_thresholds)
+        self._frameworks = compact_frameworks(frameworks, self._pool)
+        self._load_frameworks = None
+        self._reverse_index = None
+        self.capability_taxonomy = capability_taxonomy
+        self.eu_requirements = eu_requirements
+        self.compute_thresholds = compute_thresholds
+        self.tier_index = TierIndex(self._frameworks, capability_taxonomy,
+                                    self._pool)
+        self.compute_index = ComputeThresholdIndex.build(
+            self.tier_index, eu_requirements, compute_thresholds)
+
+    @classmethod
+    def from_compiled(cls, tier_index, load_frameworks, capability_taxonomy,
+                      eu_requirements, compute_thresholds, version, pool=None):
+        """Wrap an already compiled index (e.g. from a snapshot)
+
+        load_frameworks is called on first access to frameworks, since only
+        the app's browsing views need the full records.
+        """
+        data = cls.__new__(cls)
+        data._pool = pool if pool is not None else StringPool()
+        data.version = version
+        data._frameworks = None
+        data._load_frameworks = load_frameworks
+        data._reverse_index = None
+        data.capability_taxonomy = capability_taxonomy
+        data.eu_requirements = eu_requirements
+        data.compute_thresholds = compute_thresholds
+        data.tier_index = tier_index
+        data.compute_index = ComputeThresholdIndex.build(
+            tier_index, eu_requirements, compute_thresholds)
+        return data
+
+    @property
+    def frameworks(self):
+        if self._frameworks is None:
+            with _frameworks_lock:
+                if self._frameworks is None:
+                    self._frameworks = compact_frameworks(
+                        self._load_frameworks(), self._pool)
+                    self._load_frameworks = None
+        return self._frameworks
+
+    @property
+    def reverse_index(self):
+        """Capability and evaluation lookups, built on first use"""
+        if self._reverse_index is None:
+            reverse_index = ReverseIndex(self.tier_index, self.frameworks)
+            with _frameworks_lock:
+                if self._reverse_index is None:
+                    self._reverse_index = reverse_index
+        return self._reverse_index
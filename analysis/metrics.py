@@ -0,0 +1,200 @@
+import json
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Upper bounds (seconds) of the latency histogram buckets, 1 µs to 10 s
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4,
+                   5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in the Prometheus layout"""
+
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self):
+        # One slot per bucket plus an overflow slot for +Inf
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) for every bucket"""
+        total = 0
+        buckets = []
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'), ),
+                                self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float('inf')
+
+
+class _NullTimer:
+    """Stand-in timer used while metrics are disabled; every call is a no-op"""
+
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def done(self, operation):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class StageTimer:
+    """Times consecutive stages of one operation
+
+    Laps and counts are held locally and handed to the metrics in one go
+    by done(), so an operation takes the metrics lock once.
+    """
+
+    __slots__ = ('metrics', 'start', 'last', 'laps', 'counts')
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.laps = []
+        self.counts = []
+        self.start = self.last = perf_counter()
+
+    def lap(self, stage):
+        """Record the time since the previous lap under stage"""
+        now = perf_counter()
+        self.laps.append((stage, now - self.last))
+        self.last = now
+
+    def count(self, name, value=1):
+        self.counts.append((name, value))
+
+    def done(self, operation):
+        """Record the whole operation's latency, its laps and counters
+
+        The operation's histogram count doubles as its call count.
+        """
+        self.laps.append((operation, perf_counter() - self.start))
+        self.metrics.record(self.laps, self.counts)
+
+
+class MatcherMetrics:
+    """Per-stage latency histograms and counters for ThresholdMatcher
+
+    Disabled by default: timer() then hands out a shared no-op timer, so
+    the hot path pays a few empty method calls and nothing is recorded.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def timer(self):
+        """A timer for one operation (a no-op while disabled)"""
+        return StageTimer(self) if self.enabled else NULL_TIMER
+
+    def record(self, laps, counts=()):
+        """Add (stage, seconds) latencies and (counter, value) increments"""
+        with self._lock:
+            for stage, seconds in laps:
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = LatencyHistogram()
+                histogram.observe(seconds)
+            for name, value in counts:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def to_dict(self, gauges=None):
+        """JSON-compatible dump of counters, histograms and extra gauges"""
+        with self._lock:
+            stages = {}
+            for stage, histogram in self.histograms.items():
+                stages[stage] = {
+                    'count': histogram.count,
+                    'sum_seconds': histogram.sum,
+                    'mean_seconds':
+                    histogram.sum / histogram.count if histogram.count else 0.0,
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p99_seconds': histogram.quantile(0.99),
+                    'buckets': {
+                        'le_' + _format_bound(bound): total
+                        for bound, total in histogram.cumulative()
+                    },
+                }
+            return {
+                'enabled': self.enabled,
+                'counters': dict(self.counters),
+                'gauges': dict(gauges or {}),
+                'stages': stages,
+            }
+
+    def to_json(self, gauges=None):
+        return json.dumps(self.to_dict(gauges), indent=2)
+
+    def to_prometheus(self, gauges=None, prefix='threshold_matcher'):
+        """Prometheus text exposition format snapshot
+
+        gauges maps a name to a value, or to a (value, labels) pair.
+        """
+        lines = []
+        with self._lock:
+            if self.histograms:
+                name = f"{prefix}_stage_seconds"
+                lines.append(f"# HELP {name} Latency of matcher stages")
+                lines.append(f"# TYPE {name} histogram")
+                for stage, histogram in sorted(self.histograms.items()):
+                    for bound, total in histogram.cumulative():
+                        lines.append(
+                            f'{name}_bucket{{stage="{stage}",'
+                            f'le="{_format_bound(bound)}"}} {total}')
+                    lines.append(
+                        f'{name}_sum{{stage="{stage}"}} {histogram.sum!r}')
+                    lines.append(
+                        f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in sorted(self.counters.items()):
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+
+        for gauge, value in (gauges or {}).items():
+            labels = ''
+            if isinstance(value, tuple):
+                value, label_values = value
+                labels = '{' + ','.join(
+                    f'{key}="{label}"'
+                    for key, label in label_values.items()) + '}'
+            name = f"{prefix}_{gauge}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{labels} {float(value)!r}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SHARD_MODELS = 'models'
+SHARD_FRAMEWORKS = 'frameworks'
+
+# Tasks per worker, so uneven blocks still keep every core busy
+BLOCKS_PER_WORKER = 4
+
+# Index the workers match against, set once per worker process
+_worker_index = None
+
+# Forked workers read the index from this process's global, so only one
+# sharded batch runs at a time
+_pool_lock = threading.Lock()
+
+
+def _init_worker(tier_index):
+    global _worker_index
+    _worker_index = tier_index
+
+
+def _assess_block(task):
+    """Tier codes and levels for one block of models x frameworks"""
+    rows, frameworks, computes, capability_positions = task
+    index = _worker_index
+    positions = index.batch_positions(computes, capability_positions,
+                                      frameworks)
+    return (rows, frameworks, index.batch_tier_codes(positions, frameworks),
+            index.batch_tier_levels(positions, frameworks))
+
+
+def _blocks(length, count):
+    """Split range(length) into at most count contiguous slices"""
+    bounds = np.linspace(0, length, min(count, length) + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start]
+
+
+def _pool(tier_index, workers):
+    """Process pool whose workers all hold tier_index
+
+    With fork the workers inherit the index from this process, so it is
+    never pickled; otherwise each worker unpickles it once at start-up.
+    Tasks then only carry their block of models.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _init_worker(tier_index)
+        return ProcessPoolExecutor(workers,
+                                   multiprocessing.get_context('fork'))
+    return ProcessPoolExecutor(workers, initializer=_init_worker,
+                               initargs=(tier_index, ))
+
+
+def sharded_outcomes(tier_index, computes, capability_sets, workers=None,
+                     shard=SHARD_MODELS):
+    """Batch tier codes and normalized levels computed across processes
+
+    Work is split into blocks of models (shard='models') or of frameworks
+    (shard='frameworks', for few models against a very large corpus),
+    over every core unless workers is given. Each block's result is
+    written to its own slice of the M x F output, so the result is
+    identical to the single-process one whatever order the blocks finish
+    in.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_models, n_frameworks = len(computes), len(tier_index)
+    codes = np.zeros((n_models, n_frameworks), dtype=np.intp)
+    levels = np.zeros((n_models, n_frameworks))
+    if not n_models or not n_frameworks:
+        return codes, levels
+
+    table, ids = tier_index.batch_capability_positions(capability_sets)
+    count = workers * BLOCKS_PER_WORKER
+    if shard == SHARD_MODELS:
+        everything = slice(None)
+        tasks = [(rows, everything, computes[rows], table[ids[rows]])
+                 for rows in _blocks(n_models, count)]
+    elif shard == SHARD_FRAMEWORKS:
+        everything = slice(None)
+        tasks = [(everything, frameworks, computes, table[:, frameworks][ids])
+                 for frameworks in _blocks(n_frameworks, count)]
+    else:
+        raise ValueError(f"Unknown shard mode: {shard}")
+
+    with _pool_lock:
+        try:
+            with _pool(tier_index, workers) as pool:
+                for rows, frameworks, block_codes, block_levels in pool.map(
+                        _assess_block, tasks):
+                    codes[rows, frameworks] = block_codes
+                    levels[rows, frameworks] = block_levels
+        finally:
+            _init_worker(None)
+    return codes, levels
@@ -0,0 +1,100 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from analysis.compute_index import EU_AI_ACT, REGULATION
+
+# Kinds of threshold projected unless asked otherwise
+REGULATORY_KINDS = (EU_AI_ACT, REGULATION)
+
+DAYS_PER_YEAR = 365.2425
+
+
+def annual_improvement_rate(compute_thresholds):
+    """Algorithmic efficiency gain per year from compute_thresholds.json"""
+    efficiency = compute_thresholds.get('algorithmic_efficiency', {})
+    return float(efficiency.get('annual_improvement_rate', 0.0))
+
+
+class EffectiveComputeProjection:
+    """Effective training compute of a batch of models over a monthly grid
+
+    Algorithmic progress makes each training FLOP worth (1 + rate) times
+    more every year, so c training FLOPs carry c * (1 + rate) ** t
+    effective FLOPs t years after training, measured against thresholds
+    fixed in FLOPs. Everything is computed at once by broadcasting models
+    against the grid (effective, M x T) and against the thresholds
+    (crossing_years and crossing_dates, M x K).
+    """
+
+    def __init__(self, names, computes, thresholds, rate, start=None,
+                 years=10, trained_on=None):
+        self.names = list(names)
+        self.computes = np.asarray(computes, dtype=float)
+        self.thresholds = list(thresholds)
+        self.threshold_flops = np.array(
+            [threshold['flops'] for threshold in self.thresholds], dtype=float)
+        self.rate = rate
+
+        # Monthly from the first of start's month
+        self.grid = (np.datetime64(start or date.today(), 'M') +
+                     np.arange(int(years * 12) + 1)).astype('datetime64[D]')
+        if trained_on is None:
+            self.trained_on = np.full(len(self.names), self.grid[0])
+        else:
+            self.trained_on = np.asarray(trained_on, dtype='datetime64[D]')
+
+        # Years since training at every grid point, nan before training
+        elapsed = (self.grid[None, :] - self.trained_on[:, None]).astype(
+            float) / DAYS_PER_YEAR
+        elapsed[elapsed < 0] = np.nan
+        growth = np.log1p(rate)
+        self.effective = self.computes[:, None] * np.exp(growth * elapsed)
+
+        # Solve c * (1 + rate) ** t = threshold for t; 0 when already
+        # crossed at training, inf when never crossed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            years_needed = np.log(self.threshold_flops[None, :] /
+                                  self.computes[:, None]) / growth
+        crossed = self.computes[:, None] >= self.threshold_flops[None, :]
+        years_needed = np.where(crossed, 0.0, years_needed)
+        if growth <= 0:
+            years_needed = np.where(crossed, 0.0, np.inf)
+        self.crossing_years = years_needed
+
+        finite = np.isfinite(years_needed)
+        days = np.where(finite, np.round(years_needed * DAYS_PER_YEAR), 0)
+        self.crossing_dates = self.trained_on[:, None] + days.astype(
+            'timedelta64[D]')
+        self.crossing_dates[~finite] = np.datetime64('NaT')
+
+    def trajectory(self) -> pd.DataFrame:
+        """Effective compute per model (rows) at every grid date (columns)"""
+        return pd.DataFrame(self.effective,
+                            index=pd.Index(self.names, name='model_name'),
+                            columns=pd.DatetimeIndex(self.grid, name='date'))
+
+    def crossings(self, within_horizon=False) -> pd.DataFrame:
+        """One row per model and threshold with the date it is crossed
+
+        crossing_date is empty for thresholds never reached; with
+        within_horizon, only crossings on or before the last grid date are
+        kept.
+        """
+        n_models, n_thresholds = self.crossing_years.shape
+        model_rows = np.repeat(np.arange(n_models), n_thresholds)
+        threshold_rows = np.tile(np.arange(n_thresholds), n_models)
+        table = pd.DataFrame({
+            'model_name': np.asarray(self.names, dtype=object)[model_rows],
+            'source': [self.thresholds[i]['source'] for i in threshold_rows],
+            'kind': [self.thresholds[i]['kind'] for i in threshold_rows],
+            'tier': [self.thresholds[i]['tier'] for i in threshold_rows],
+            'threshold_flops': self.threshold_flops[threshold_rows],
+            'training_compute_flops': self.computes[model_rows],
+            'years_to_cross': self.crossing_years.ravel(),
+            'crossing_date': self.crossing_dates.ravel(),
+        })
+        if within_horizon:
+            table = table[table['crossing_date'] <= self.grid[-1]]
+        return table.reset_index(drop=True)
@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from analysis.assessment_cache import data_version, model_specs_key
+from analysis.gap_analysis import PortfolioGaps
+from analysis.tier_index import BELOW_THRESHOLD, UNNAMED_TIER
+
+RESULTS_PATH = 'data/processed/results.npz'
+
+# Bump when the layout below changes; older stores are then rebuilt
+RESULTS_FORMAT = 1
+
+STATISTICS = ('both', 'only_triggered', 'level_disagree', 'level_gap_sum')
+
+
+def framework_digests(tier_index):
+    """Hash of everything a framework-name column's matching depends on
+
+    Same-named frameworks are merged into one column, so the digest covers
+    all of them in order: tier names, levels, capability texts and compute
+    thresholds.
+    """
+    parts = {}
+    for framework in tier_index.frameworks:
+        parts.setdefault(framework.name, []).append([
+            list(framework.tier_names),
+            list(framework.tier_levels),
+            list(framework.tier_texts),
+            [None if flops != flops else flops
+             for flops in framework.tier_flops],
+        ])
+    return {
+        name: hashlib.sha256(json.dumps(part).encode()).hexdigest()[:16]
+        for name, part in parts.items()
+    }
+
+
+def _spec_key(model_specs):
+    return json.dumps(model_specs_key(model_specs))
+
+
+class ResultStore:
+    """Persisted assessments of a model registry, updated incrementally
+
+    Holds the M x F outcome matrices (tier label, normalized level) of a
+    registry and the framework x framework pair statistics derived from
+    them. Each column records the digest of the frameworks it was computed
+    from and each row the specs it was computed for, so update() only
+    recomputes columns whose frameworks changed and rows whose specs
+    changed. Pair statistics are sums over models, so rows are patched by
+    subtracting stale rows and adding fresh ones; changed columns only
+    recompute the pairs they take part in.
+    """
+
+    def __init__(self, path=RESULTS_PATH):
+        self.path = path
+        self.model_names = []
+        self.model_keys = []
+        self.computes = np.empty(0)
+        self.capability_sets = []
+        self.taxonomy_digest = None
+        self._clear_columns()
+        self._load()
+
+    def _clear_columns(self):
+        self.framework_names = []
+        self.framework_digests = []
+        # Tier labels are stored as indexes into labels, -1 where the
+        # framework assigned no named tier
+        self.labels = [BELOW_THRESHOLD]
+        self.label_codes = np.empty((len(self.model_names), 0),
+                                    dtype=np.int32)
+        self.levels = np.empty((len(self.model_names), 0))
+        self.statistics = tuple(
+            np.zeros((0, 0), dtype=np.int64) for _ in STATISTICS[:3]) + (
+                np.zeros((0, 0)), )
+
+    def __len__(self):
+        return len(self.model_names)
+
+    @property
+    def matched(self):
+        return self.label_codes >= 0
+
+    @property
+    def triggered(self):
+        return self.label_codes > 0
+
+    def _outcomes(self, rows=slice(None), columns=slice(None)):
+        return (self.levels[rows][:, columns], self.matched[rows][:, columns],
+                self.triggered[rows][:, columns])
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as z:
+                meta = json.loads(z['meta'].tobytes())
+                if meta['format'] != RESULTS_FORMAT:
+                    return
+                self.label_codes = z['label_codes']
+                self.levels = z['levels']
+                self.computes = z['computes']
+                self.statistics = tuple(z[name] for name in STATISTICS)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            print(f"⚠️ Unreadable result store {self.path}, starting over: {e}")
+            return
+        self.model_names = meta['model_names']
+        self.model_keys = meta['model_keys']
+        self.capability_sets = meta['capability_sets']
+        self.framework_names = meta['framework_names']
+        self.framework_digests = meta['framework_digests']
+        self.taxonomy_digest = meta['taxonomy_digest']
+        self.labels = meta['labels']
+
+    def save(self):
+        """Write the store atomically"""
+        meta = {
+            'format': RESULTS_FORMAT,
+            'model_names': self.model_names,
+            'model_keys': self.model_keys,
+            'capability_sets': self.capability_sets,
+            'framework_names': self.framework_names,
+            'framework_digests': self.framework_digests,
+            'taxonomy_digest': self.taxonomy_digest,
+            'labels': self.labels,
+        }
+        entries = dict(zip(STATISTICS, self.statistics))
+        entries.update(
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            label_codes=self.label_codes,
+            levels=self.levels,
+            computes=self.computes)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **entries)
+        os.replace(tmp_path, self.path)
+
+    def _encode(self, tier_labels, codes):
+        """Store label codes for tier codes of a given index"""
+        positions = {label: i for i, label in enumerate(self.labels)}
+        mapping = np.empty(len(tier_labels), dtype=np.int32)
+        for code, label in enumerate(tier_labels):
+            if code == UNNAMED_TIER:
+                mapping[code] = -1
+                continue
+            if label not in positions:
+                positions[label] = len(self.labels)
+                self.labels.append(label)
+            mapping[code] = positions[label]
+        return mapping[codes]
+
+    def _match(self, tier_index, computes, capability_sets, names=None):
+        """Label codes and levels in this store's columns order"""
+        index = tier_index if names is None else tier_index.subset(names)
+        framework_names, codes, levels = index.batch_outcomes(
+            computes, capability_sets)
+        position = {name: i for i, name in enumerate(framework_names)}
+        order = [position[name] for name in self.framework_names
+                 if names is None or name in names]
+        return self._encode(index.tier_labels, codes[:, order]), \
+            levels[:, order]
+
+    def update(self, data, specs=None):
+        """Bring the store up to date with data and, optionally, a registry
+
+        data is the matcher's MatcherData. specs, a list of ModelSpecs,
+        replaces the registry: rows are matched by model name and only
+        recomputed if their specs changed. Returns what was recomputed.
+        """
+        tier_index = data.tier_index
+        digests = framework_digests(tier_index)
+        taxonomy_digest = data_version(data.capability_taxonomy)
+        if taxonomy_digest != self.taxonomy_digest:
+            # Capability matching of every tier may have changed
+            self._clear_columns()
+            self.taxonomy_digest = taxonomy_digest
+
+        summary = {'models_recomputed': 0, 'models_removed': 0}
+
+        # Drop rows that are gone or whose specs changed
+        if specs is not None:
+            wanted = {spec.name: _spec_key(spec) for spec in specs}
+            if len(wanted) != len(specs):
+                raise ValueError("Model names in a registry must be unique")
+            summary['models_removed'] = sum(
+                name not in wanted for name in self.model_names)
+            keep = np.array([wanted.get(name) == key for name, key in zip(
+                self.model_names, self.model_keys)], dtype=bool)
+            stale = np.flatnonzero(~keep)
+            if len(stale):
+                removed = PortfolioGaps.pair_statistics(
+                    self._outcomes(stale), self._outcomes(stale))
+                self.statistics = tuple(
+                    total - part
+                    for total, part in zip(self.statistics, removed))
+                self._take_rows(np.flatnonzero(keep))
+
+        # Recompute changed framework columns for the remaining rows
+        stored = dict(zip(self.framework_names, self.framework_digests))
+        changed = {name for name, digest in digests.items()
+                   if stored.get(name) != digest}
+        summary['frameworks_removed'] = [
+            name for name in self.framework_names if name not in digests
+        ]
+        summary['frameworks_recomputed'] = [
+            name for name in digests if name in changed
+        ]
+        if changed or summary['frameworks_removed']:
+            self._update_columns(tier_index, digests, changed)
+
+        # Add new and changed rows across every column, then restore the
+        # registry's order
+        if specs is not None:
+            present = set(self.model_names)
+            fresh = [spec for spec in specs if spec.name not in present]
+            if fresh:
+                self._add_rows(tier_index, fresh)
+            summary['models_recomputed'] = len(fresh)
+            row = {name: i for i, name in enumerate(self.model_names)}
+            self._take_rows(np.array([row[spec.name] for spec in specs],
+                                     dtype=np.intp))
+
+        summary['models'] = len(self.model_names)
+        return summary
+
+    def _take_rows(self, rows):
+        self.model_names = [self.model_names[i] for i in rows]
+        self.model_keys = [self.model_keys[i] for i in rows]
+        self.capability_sets = [self.capability_sets[i] for i in rows]
+        self.computes = self.computes[rows]
+        self.label_codes = self.label_codes[rows]
+        self.levels = self.levels[rows]
+
+    def _update_columns(self, tier_index, digests, changed):
+        old_names = self.framework_names
+        old_position = {name: i for i, name in enumerate(old_names)}
+        new_names = list(digests)
+        kept = [j for j, name in enumerate(new_names)
+                if name in old_position and name not in changed]
+        kept_old = [old_position[new_names[j]] for j in kept]
+        fresh = [j for j, name in enumerate(new_names)
+                 if name not in old_position or name in changed]
+
+        n_models, n_frameworks = len(self.model_names), len(new_names)
+        label_codes = np.full((n_models, n_frameworks), -1, dtype=np.int32)
+        levels = np.zeros((n_models, n_frameworks))
+        label_codes[:, kept] = self.label_codes[:, kept_old]
+        levels[:, kept] = self.levels[:, kept_old]
+
+        self.framework_names = new_names
+        self.framework_digests = [digests[name] for name in new_names]
+        if fresh and n_models:
+            fresh_names = {new_names[j] for j in fresh}
+            label_codes[:, fresh], levels[:, fresh] = self._match(
+                tier_index, self.computes, self.capability_sets, fresh_names)
+        self.label_codes, self.levels = label_codes, levels
+
+        # Pairs between unchanged columns are reused; pairs involving a
+        # fresh column are computed against every column
+        statistics = []
+        for old in self.statistics:
+            new = np.zeros((n_frameworks, n_frameworks), dtype=old.dtype)
+            new[np.ix_(kept, kept)] = old[np.ix_(kept_old, kept_old)]
+            statistics.append(new)
+        if fresh:
+            rows = PortfolioGaps.pair_statistics(self._outcomes(columns=fresh),
+                                                 self._outcomes())
+            cols = PortfolioGaps.pair_statistics(self._outcomes(),
+                                                 self._outcomes(columns=fresh))
+            for new, row, col in zip(statistics, rows, cols):
+                new[fresh, :] = row
+                new[:, fresh] = col
+        self.statistics = tuple(statistics)
+
+    def _add_rows(self, tier_index, specs):
+        computes = np.array([spec.training_compute_flops for spec in specs],
+                            dtype=float)
+        capability_sets = [list(spec.capabilities) for spec in specs]
+        label_codes, levels = self._match(tier_index, computes,
+                                          capability_sets)
+        start = len(self.model_names)
+        self.model_names += [spec.name for spec in specs]
+        self.model_keys += [_spec_key(spec) for spec in specs]
+        self.capability_sets += capability_sets
+        self.computes = np.concatenate([self.computes, computes])
+        self.label_codes = np.vstack([self.label_codes, label_codes])
+        self.levels = np.vstack([self.levels, levels])
+
+        added = PortfolioGaps.pair_statistics(
+            self._outcomes(slice(start, None)),
+            self._outcomes(slice(start, None)))
+        self.statistics = tuple(
+            total + part for total, part in zip(self.statistics, added))
+
+    def assessments(self) -> pd.DataFrame:
+        """Tier per model (rows) and framework (columns), as in assess_many"""
+        labels = np.array(self.labels + [None], dtype=object)
+        return pd.DataFrame(labels[self.label_codes],
+                            index=pd.Index(self.model_names,
+                                           name='model_name'),
+                            columns=self.framework_names)
+
+    def portfolio_gaps(self) -> PortfolioGaps:
+        """Pair statistics of the stored registry, without recomputing"""
+        levels, matched, triggered = self._outcomes()
+        return PortfolioGaps.from_statistics(self.model_names,
+                                             self.framework_names, levels,
+                                             matched, triggered,
+                                             self.statistics)
@@ -0,0 +1,82 @@
+from analysis.tier_index import _as_flops
+
+
+def _normalize(text):
+    return ' '.join(str(text).lower().split())
+
+
+class ReverseIndex:
+    """Lookups from capabilities and evaluations to the tiers involving them
+
+    by_family maps each taxonomy family to the tiers whose capability
+    threshold mentions one of its terms, in framework and tier order: the
+    tiers any capability mentioning one of those terms touches through the
+    family. by_evaluation maps each evaluation requirement (lowercased,
+    whitespace collapsed) to the tiers that require it. Both are plain
+    dicts, so a lookup is O(1).
+    """
+
+    def __init__(self, tier_index, frameworks):
+        self.tier_index = tier_index
+        self._entries = []
+        for framework in tier_index.frameworks:
+            for name, level, flops in zip(framework.tier_names,
+                                          framework.tier_levels,
+                                          framework.tier_flops):
+                self._entries.append({
+                    'framework': framework.name,
+                    'tier': name,
+                    'tier_level': int(level),
+                    'compute_threshold_flops':
+                    None if flops != flops else flops,
+                })
+
+        self.by_family = {
+            family: self._tiers(ids)
+            for family, ids in tier_index.capabilities.family_tiers.items()
+        }
+
+        self.by_evaluation = {}
+        self._evaluation_text = {}
+        for framework in frameworks:
+            for tier in framework.get('risk_tiers') or []:
+                for evaluation in tier.get('evaluation_requirements') or []:
+                    key = _normalize(evaluation)
+                    self._evaluation_text.setdefault(key, evaluation)
+                    self.by_evaluation.setdefault(key, []).append({
+                        'framework': framework.get('framework_name'),
+                        'organization': framework.get('organization'),
+                        'tier': tier.get('tier_name'),
+                        'tier_level': int(tier.get('tier_level') or 0),
+                        'compute_threshold_flops':
+                        _as_flops(tier.get('compute_threshold_flops')),
+                    })
+
+    def _tiers(self, ids):
+        return [self._entries[i] for i in sorted(ids)]
+
+    def families(self):
+        return list(self.by_family)
+
+    def evaluations(self):
+        """Every distinct evaluation requirement, as first written"""
+        return list(self._evaluation_text.values())
+
+    def tiers_for_capability(self, capability):
+        """Tiers a model with capability touches
+
+        A taxonomy family name returns the family's tiers (by_family),
+        which may differ from matching the name itself as a model
+        capability when it contains none of the family's terms. Any other
+        phrase is resolved as a model capability would be.
+        """
+        key = _normalize(capability)
+        tiers = self.by_family.get(key)
+        if tiers is None:
+            tiers = self._tiers(
+                self.tier_index.capabilities.phrase_tiers(key))
+        return tiers
+
+    def tiers_for_evaluation(self, evaluation):
+        """Tiers whose evaluation requirements include evaluation"""
+        return self.by_evaluation.get(_normalize(evaluation), [])
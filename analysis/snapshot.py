@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from analysis.framework_store import StringPool
+from analysis.matcher_data import MatcherData
+from analysis.models import Framework
+from analysis.tier_index import TierIndex
+
+SNAPSHOT_PATH = 'data/processed/snapshot.npz'
+
+# Bump when the layout below changes; older snapshots are then ignored
+SNAPSHOT_FORMAT = 2
+
+
+def source_digest(paths):
+    """Content hash of the JSON files a snapshot was built from"""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        except FileNotFoundError:
+            digest.update(b'missing')
+    return digest.hexdigest()
+
+
+def _bytes(value):
+    return np.frombuffer(value, dtype=np.uint8)
+
+
+class _StringTable:
+    """Dictionary-encodes strings as int32 ids (-1 for None)"""
+
+    def __init__(self):
+        self.ids = {}
+
+    def encode(self, values):
+        return np.array([
+            -1 if value is None else self.ids.setdefault(value, len(self.ids))
+            for value in values
+        ], dtype=np.int32)
+
+    def arrays(self):
+        encoded = [value.encode('utf-8') for value in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return _bytes(b''.join(encoded)), offsets
+
+    @staticmethod
+    def decoder(blob, offsets):
+        blob = blob.tobytes()
+        offsets = offsets.tolist()
+        strings = [
+            blob[start:end].decode('utf-8')
+            for start, end in zip(offsets, offsets[1:])
+        ]
+        return lambda ids: [None if i < 0 else strings[i] for i in ids.tolist()]
+
+
+def write_snapshot(data, path, digest):
+    """Validate matcher data and write it as a binary snapshot
+
+    Raises a pydantic ValidationError if any framework does not fit the
+    Framework model. The file is replaced atomically so a running matcher
+    never reads a partial snapshot.
+    """
+    frameworks = [framework.to_dict() for framework in data.frameworks]
+    for framework in frameworks:
+        Framework.model_validate(framework)
+
+    arrays = data.tier_index.to_arrays()
+    strings = _StringTable()
+    entries = {
+        'framework_name_ids': strings.encode(arrays['framework_names']),
+        'tier_name_ids': strings.encode(arrays['tier_names']),
+        'tier_text_ids': strings.encode(arrays['tier_texts']),
+        'family_name_ids': strings.encode(arrays['family_names']),
+        'tier_counts': arrays['tier_counts'],
+        'tier_levels': arrays['tier_levels'],
+        'tier_flops': arrays['tier_flops'],
+        'neg_min_flops': arrays['neg_min_flops'],
+        'family_tier_counts': arrays['family_tier_counts'],
+        'family_tier_ids': arrays['family_tier_ids'],
+    }
+    entries['strings_blob'], entries['string_offsets'] = strings.arrays()
+    entries['meta'] = _bytes(json.dumps({
+        'format': SNAPSHOT_FORMAT,
+        'data_version': data.version,
+        'source_digest': digest
+    }).encode())
+    entries['documents'] = _bytes(json.dumps({
+        'capability_taxonomy': data.capability_taxonomy,
+        'eu_requirements': data.eu_requirements,
+        'compute_thresholds': data.compute_thresholds
+    }).encode())
+    entries['frameworks'] = _bytes(json.dumps(frameworks).encode())
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **entries)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, digest):
+    """Load matcher data from a snapshot, or None if absent or stale
+
+    A snapshot is only used when it was built from JSON files with the
+    given content digest; otherwise the caller falls back to the JSON.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(z['meta'].tobytes())
+            if meta.get('format') != SNAPSHOT_FORMAT or \
+               meta.get('source_digest') != digest:
+                return None
+
+            decode = _StringTable.decoder(z['strings_blob'],
+                                          z['string_offsets'])
+            documents = json.loads(z['documents'].tobytes())
+            arrays = {
+                'framework_names': decode(z['framework_name_ids']),
+                'tier_names': decode(z['tier_name_ids']),
+                'tier_texts': decode(z['tier_text_ids']),
+                'family_names': decode(z['family_name_ids']),
+                'tier_counts': z['tier_counts'],
+                'tier_levels': z['tier_levels'],
+                'tier_flops': z['tier_flops'],
+                'neg_min_flops': z['neg_min_flops'],
+                'family_tier_counts': z['family_tier_counts'],
+                'family_tier_ids': z['family_tier_ids'],
+            }
+            frameworks_json = z['frameworks'].tobytes()
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        print(f"⚠️ Unreadable snapshot {path}, using JSON: {e}")
+        return None
+
+    taxonomy = documents['capability_taxonomy']
+    pool = StringPool()
+    return MatcherData.from_compiled(
+        TierIndex.from_arrays(arrays, taxonomy),
+        lambda: json.loads(frameworks_json),
+        taxonomy,
+        documents['eu_requirements'],
+        documents['compute_thresholds'],
+        meta['data_version'],
+        pool)
+
+
+def rebuild_snapshot(root='.'):
+    """Rebuild the snapshot from the JSON under root, reporting the outcome"""
+    from analysis.threshold_matcher import ThresholdMatcher
+
+    try:
+        path = ThresholdMatcher(root=root, use_snapshot=False).build_snapshot()
+    except ValueError as e:
+        print(f"⚠️ Snapshot not written, data failed validation: {e}")
+        return None
+    print(f"📦 Snapshot updated: {path}")
+    return path
+
+
+if __name__ == "__main__":
+    rebuild_snapshot()
@@ -0,0 +1,455 @@
+import json
+import math
+import os
+import re
+import zipfile
+
+import numpy as np
+
+from analysis.snapshot import source_digest
+
+TEXT_INDEX_PATH = 'data/processed/text_index.npz'
+
+# Bump when the layout below changes; older index files are then rebuilt
+TEXT_INDEX_FORMAT = 1
+
+# Tier fields that are searched, in position order
+FIELDS = ('tier_name', 'capability_threshold', 'evaluation_requirements',
+          'required_safeguards', 'deployment_restrictions', 'source_quote')
+
+# Short names accepted by field: filters
+FIELD_ALIASES = {
+    'name': 'tier_name',
+    'tier': 'tier_name',
+    'capability': 'capability_threshold',
+    'threshold': 'capability_threshold',
+    'evaluations': 'evaluation_requirements',
+    'evals': 'evaluation_requirements',
+    'safeguards': 'required_safeguards',
+    'restrictions': 'deployment_restrictions',
+    'deployment': 'deployment_restrictions',
+    'quote': 'source_quote',
+}
+
+# Token positions of field i start at i * FIELD_STRIDE, and list items are
+# separated by ITEM_GAP, so phrases never match across fields or items
+FIELD_STRIDE = 1 << 20
+ITEM_GAP = 8
+
+# Phrase matching packs (doc, position) into one int64 key
+DOC_SHIFT = 24
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_QUERY = re.compile(r'(\w+):("[^"]*"|\S+)|"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    """Lowercased alphanumeric tokens of a text"""
+    return _TOKEN.findall(text.lower())
+
+
+def _field_values(tier, field):
+    value = tier.get(field)
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item]
+    return [str(value)]
+
+
+def _encode(values):
+    """Distinct values and the code of each value in their list"""
+    codes = {}
+    ids = np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                      dtype=np.int32, count=len(values))
+    return list(codes), ids
+
+
+def _field_name(field):
+    field = field.lower()
+    return FIELD_ALIASES.get(field, field)
+
+
+def _valid_level(level):
+    try:
+        _level_range(level)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_query(query):
+    """Split a query into terms, phrases and filters
+
+    "quoted text" is a phrase; org:, framework:, level: and field: are
+    filters (level takes N, >=N, <=N, >N or <N; field a FIELDS name or
+    alias). Everything else, including a level: or field: filter with an
+    invalid value, is a search term.
+    """
+    terms, phrases, filters = [], [], {}
+    for key, value, phrase, word in _QUERY.findall(query):
+        if key:
+            key = key.lower()
+            value = value.strip('"')
+            if key in ('org', 'organization'):
+                filters['organization'] = value
+            elif key == 'framework':
+                filters['framework'] = value
+            elif key == 'level' and _valid_level(value):
+                filters['tier_level'] = value
+            elif key == 'field' and _field_name(value) in FIELDS:
+                filters.setdefault('fields', []).append(value)
+            else:
+                terms.extend(tokenize(f"{key} {value}"))
+        elif phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) > 1:
+                phrases.append(tokens)
+            else:
+                terms.extend(tokens)
+        else:
+            terms.extend(tokenize(word))
+    return terms, phrases, filters
+
+
+def _level_range(level):
+    """(low, high) inclusive bounds for a level filter value"""
+    if isinstance(level, (tuple, list)):
+        return float(level[0]), float(level[1])
+    level = str(level).strip()
+    for op, bounds in (('>=', lambda v: (v, math.inf)),
+                       ('<=', lambda v: (-math.inf, v)),
+                       ('>', lambda v: (math.nextafter(v, math.inf), math.inf)),
+                       ('<', lambda v: (-math.inf, math.nextafter(v, -math.inf)))):
+        if level.startswith(op):
+            return bounds(float(level[len(op):]))
+    return float(level), float(level)
+
+
+class TextIndex:
+    """BM25 inverted index over the text of every framework tier
+
+    Each tier is one document. Postings are flat arrays: for term t,
+    post_docs[term_offsets[t]:term_offsets[t + 1]] are the documents
+    containing it and post_tf their term frequencies, and each posting's
+    token positions sit in positions[pos_offsets[p]:pos_offsets[p + 1]].
+    Positions are offset per field, so field filters and phrase queries
+    are answered from the postings alone.
+    """
+
+    def __init__(self, arrays, docs):
+        self.terms = arrays['terms']
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+        self.term_offsets = arrays['term_offsets']
+        self.post_docs = arrays['post_docs']
+        self.post_tf = arrays['post_tf']
+        self.pos_offsets = arrays['pos_offsets']
+        self.positions = arrays['positions']
+        self.doc_len = arrays['doc_len']
+        self.doc_level = arrays['doc_level']
+        self.doc_organization = arrays['doc_organization']
+        self.doc_framework = arrays['doc_framework']
+        self._docs_value = docs
+        # Few distinct names, so filters test each name once
+        self._organizations = _encode(self.doc_organization)
+        self._frameworks = _encode(self.doc_framework)
+        self.avg_len = float(self.doc_len.mean()) if len(self.doc_len) else 0.0
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    @property
+    def _docs(self):
+        """Stored fields of every tier, in document order"""
+        if isinstance(self._docs_value, bytes):
+            self._docs_value = json.loads(self._docs_value)
+        return self._docs_value
+
+    @classmethod
+    def build(cls, frameworks):
+        """Index the tiers of a list of framework dicts"""
+        postings = {}
+        docs = []
+        doc_len = []
+        for framework in frameworks:
+            for tier in framework.get('risk_tiers') or []:
+                doc = len(docs)
+                length = 0
+                for field_no, field in enumerate(FIELDS):
+                    position = field_no * FIELD_STRIDE
+                    for item in _field_values(tier, field):
+                        for token in tokenize(item):
+                            postings.setdefault(token, {}).setdefault(
+                                doc, []).append(position)
+                            position += 1
+                            length += 1
+                        position += ITEM_GAP
+                doc_len.append(length)
+                docs.append({
+                    'organization': framework.get('organization'),
+                    'framework_name': framework.get('framework_name'),
+                    'version': framework.get('version'),
+                    **{field: tier.get(field)
+                       for field in ('tier_level', ) + FIELDS}
+                })
+
+        terms = sorted(postings)
+        term_offsets = [0]
+        post_docs, post_tf, pos_offsets, positions = [], [], [0], []
+        for term in terms:
+            for doc, doc_positions in sorted(postings[term].items()):
+                post_docs.append(doc)
+                post_tf.append(len(doc_positions))
+                positions.extend(doc_positions)
+                pos_offsets.append(len(positions))
+            term_offsets.append(len(post_docs))
+
+        def level(doc):
+            try:
+                return float(doc['tier_level'])
+            except (TypeError, ValueError):
+                return math.nan
+
+        arrays = {
+            'terms': terms,
+            'term_offsets': np.array(term_offsets, dtype=np.int64),
+            'post_docs': np.array(post_docs, dtype=np.int32),
+            'post_tf': np.array(post_tf, dtype=np.int32),
+            'pos_offsets': np.array(pos_offsets, dtype=np.int64),
+            'positions': np.array(positions, dtype=np.int32),
+            'doc_len': np.array(doc_len, dtype=np.float64),
+            'doc_level': np.array([level(doc) for doc in docs]),
+            'doc_organization': np.array(
+                [(doc['organization'] or '').lower() for doc in docs],
+                dtype=object),
+            'doc_framework': np.array(
+                [(doc['framework_name'] or '').lower() for doc in docs],
+                dtype=object),
+        }
+        return cls(arrays, docs)
+
+    def save(self, path, digest):
+        """Write the index atomically, tagged with its source digest"""
+        def strings(values):
+            return np.frombuffer(json.dumps(list(values)).encode(),
+                                 dtype=np.uint8)
+
+        entries = {
+            'meta': strings([TEXT_INDEX_FORMAT, digest]),
+            'terms': strings(self.terms),
+            'doc_organization': strings(self.doc_organization),
+            'doc_framework': strings(self.doc_framework),
+            'docs': strings(self._docs),
+        }
+        for name in ('term_offsets', 'post_docs', 'post_tf', 'pos_offsets',
+                     'positions', 'doc_len', 'doc_level'):
+            entries[name] = getattr(self, name)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **entries)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, digest):
+        """Read a saved index, or None if absent, unreadable or stale"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                if json.loads(z['meta'].tobytes()) != [TEXT_INDEX_FORMAT,
+                                                       digest]:
+                    return None
+                arrays = {name: z[name] for name in z.files
+                          if name not in ('meta', 'docs')}
+                arrays['terms'] = json.loads(arrays['terms'].tobytes())
+                for name in ('doc_organization', 'doc_framework'):
+                    arrays[name] = np.array(json.loads(arrays[name].tobytes()),
+                                            dtype=object)
+                # Parsed on the first search that returns hits
+                docs = z['docs'].tobytes()
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            print(f"⚠️ Unreadable text index {path}, rebuilding: {e}")
+            return None
+        return cls(arrays, docs)
+
+    def _postings(self, term):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+        return self.term_offsets[term_id], self.term_offsets[term_id + 1]
+
+    def _doc_positions(self, posting):
+        return self.positions[self.pos_offsets[posting]:
+                              self.pos_offsets[posting + 1]]
+
+    def _field_tf(self, start, end, fields):
+        """Term frequencies of a postings range counted in fields only"""
+        positions = self.positions[self.pos_offsets[start]:
+                                   self.pos_offsets[end]]
+        in_fields = np.isin(positions // FIELD_STRIDE, fields).astype(np.int32)
+        return np.add.reduceat(
+            in_fields, self.pos_offsets[start:end] - self.pos_offsets[start])
+
+    def _term_matches(self, term, fields):
+        """(docs, tf) of a single term, optionally restricted to fields"""
+        bounds = self._postings(term)
+        if bounds is None:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        start, end = bounds
+        docs = self.post_docs[start:end]
+        if fields is None:
+            return docs, self.post_tf[start:end]
+        tf = self._field_tf(start, end, fields)
+        keep = tf > 0
+        return docs[keep], tf[keep]
+
+    def _occurrences(self, start, end):
+        """(doc << DOC_SHIFT) | position for every occurrence in a range"""
+        counts = np.diff(self.pos_offsets[start:end + 1])
+        docs = np.repeat(self.post_docs[start:end].astype(np.int64), counts)
+        positions = self.positions[self.pos_offsets[start]:
+                                   self.pos_offsets[end]]
+        return (docs << DOC_SHIFT) | positions
+
+    def _phrase_matches(self, tokens, fields):
+        """(docs, tf) of a phrase: its tokens at consecutive positions"""
+        bounds = [self._postings(token) for token in tokens]
+        if any(b is None for b in bounds):
+            return np.empty(0, dtype=np.int32), np.empty(0)
+
+        # A phrase occurrence is a (doc, position) where token i sits at
+        # position + i, so shift each token's occurrences back by i and
+        # intersect, rarest token first
+        starts = None
+        for offset, (start, end) in sorted(enumerate(bounds),
+                                           key=lambda b: b[1][1] - b[1][0]):
+            occurrences = self._occurrences(start, end) - offset
+            starts = occurrences if starts is None else \
+                np.intersect1d(starts, occurrences, assume_unique=True)
+            if not len(starts):
+                break
+        if fields is not None and len(starts):
+            positions = starts & ((1 << DOC_SHIFT) - 1)
+            starts = starts[np.isin(positions // FIELD_STRIDE, fields)]
+        docs, tf = np.unique(starts >> DOC_SHIFT, return_counts=True)
+        return docs.astype(np.int32), tf.astype(np.float64)
+
+    def _filter_mask(self, organization=None, framework=None,
+                     tier_level=None):
+        mask = np.ones(len(self), dtype=bool)
+        for needle, (names, codes) in ((organization, self._organizations),
+                                       (framework, self._frameworks)):
+            if needle:
+                matching = [i for i, name in enumerate(names)
+                            if needle.lower() in name]
+                mask &= np.isin(codes, matching)
+        if tier_level is not None:
+            low, high = _level_range(tier_level)
+            mask &= (self.doc_level >= low) & (self.doc_level <= high)
+        return mask
+
+    def search(self, query, organization=None, framework=None,
+               tier_level=None, fields=None, limit=20):
+        """Rank tiers for a query by BM25
+
+        Terms are scored disjunctively; every phrase must match. Filters
+        given as arguments are combined with those written in the query
+        (see parse_query). organization and framework match substrings
+        case-insensitively, and tier_level takes a number, a (low, high)
+        pair or a comparison string such as ">=3". Returns one dict per
+        hit with the tier's fields, score and a snippet.
+        """
+        terms, phrases, filters = parse_query(query)
+        organization = organization or filters.get('organization')
+        framework = framework or filters.get('framework')
+        if tier_level is None:
+            tier_level = filters.get('tier_level')
+        fields = list(fields or []) + filters.get('fields', [])
+        # Unknown fields are ignored rather than matching nothing
+        field_ids = sorted({
+            FIELDS.index(_field_name(field))
+            for field in fields if _field_name(field) in FIELDS
+        }) or None
+
+        mask = self._filter_mask(organization, framework, tier_level)
+        scores = np.zeros(len(self))
+        required = np.ones(len(self), dtype=bool)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len /
+                          max(self.avg_len, 1e-9))
+
+        matches = [(self._term_matches(term, field_ids), False)
+                   for term in dict.fromkeys(terms)]
+        matches += [(self._phrase_matches(tokens, field_ids), True)
+                    for tokens in phrases]
+        for (docs, tf), is_phrase in matches:
+            if is_phrase:
+                hit = np.zeros(len(self), dtype=bool)
+                hit[docs] = True
+                required &= hit
+            if not len(docs):
+                continue
+            df = len(docs)
+            idf = math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm[docs])
+
+        if matches:
+            mask &= required & (scores > 0)
+        hits = np.flatnonzero(mask)
+        order = np.argsort(-scores[hits], kind='stable')[:limit]
+
+        tokens = set(terms).union(*phrases) if phrases else set(terms)
+        return [
+            dict(self._docs[doc], score=float(scores[doc]),
+                 snippet=self._snippet(self._docs[doc], tokens))
+            for doc in hits[order].tolist()
+        ]
+
+    @staticmethod
+    def _snippet(doc, tokens, width=200):
+        """First stretch of tier text mentioning a query token"""
+        for field in FIELDS[1:] + FIELDS[:1]:
+            for text in _field_values(doc, field):
+                lowered = text.lower()
+                hits = [lowered.find(token) for token in tokens
+                        if token in lowered]
+                if hits or not tokens:
+                    start = max(0, min(hits, default=0) - width // 4)
+                    snippet = text[start:start + width]
+                    return ('…' if start else '') + snippet + \
+                        ('…' if start + width < len(text) else '')
+        return ''
+
+
+def load_text_index(root='.', frameworks_path='data/processed/frameworks.json'):
+    """Saved index if it matches frameworks.json, else a fresh in-memory one"""
+    source = os.path.join(root, frameworks_path)
+    digest = source_digest([source])
+    index = TextIndex.load(os.path.join(root, TEXT_INDEX_PATH), digest)
+    if index is not None:
+        return index
+    try:
+        with open(source, 'r') as f:
+            frameworks = json.load(f).get('frameworks', [])
+    except FileNotFoundError:
+        frameworks = []
+    return TextIndex.build(frameworks)
+
+
+def rebuild_text_index(root='.', frameworks_path='data/processed/frameworks.json'):
+    """Rebuild the saved index from frameworks.json, reporting the outcome"""
+    source = os.path.join(root, frameworks_path)
+    with open(source, 'r') as f:
+        frameworks = json.load(f).get('frameworks', [])
+    path = os.path.join(root, TEXT_INDEX_PATH)
+    index = TextIndex.build(frameworks)
+    index.save(path, source_digest([source]))
+    print(f"🔎 Search index updated: {path} ({len(index)} tiers)")
+    return path
+
+
+if __name__ == "__main__":
+    rebuild_text_index()
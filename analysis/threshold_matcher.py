@@ -1,29 +1,272 @@
 import json
+import math
 import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from analysis.assessment_cache import AssessmentCache, model_specs_key
+from analysis.breakpoints import compute_sweep
+from analysis.capability_matcher import DEFAULT_TAXONOMY
+from analysis.gap_analysis import PortfolioGaps
+from analysis.matcher_data import MatcherData
+from analysis.metrics import MatcherMetrics
 from analysis.models import Framework, ModelSpecs, RiskAssessment, RiskTier
+from analysis.parallel import SHARD_MODELS, sharded_outcomes
+from analysis.projection import (REGULATORY_KINDS,
+                                 EffectiveComputeProjection,
+                                 annual_improvement_rate)
+from analysis.snapshot import (SNAPSHOT_PATH, read_snapshot, source_digest,
+                               write_snapshot)
+from analysis.tier_index import (BELOW_THRESHOLD, BELOW_THRESHOLD_CODE,
+                                 UNNAMED_TIER, TierIndex)
+from analysis.version_store import VERSIONS_DIR, VersionStore
+
+
+FRAMEWORKS_PATH = 'data/processed/frameworks.json'
+EU_COMPLIANCE_PATH = 'data/processed/eu_compliance.json'
+COMPUTE_THRESHOLDS_PATH = 'data/processed/compute_thresholds.json'
+CAPABILITY_TAXONOMY_PATH = 'data/capability_taxonomy.json'
+
+# Files a snapshot is built from
+SOURCE_FILES = (FRAMEWORKS_PATH, EU_COMPLIANCE_PATH, COMPUTE_THRESHOLDS_PATH,
+                CAPABILITY_TAXONOMY_PATH)
+
+# Files whose changes trigger a reload when the matcher is watching
+DATA_FILES = SOURCE_FILES + (SNAPSHOT_PATH, )
+
+
+def _capability_list(caps):
+    """Capabilities of one DataFrame cell as a list
+
+    Any non-string iterable (list, tuple, set, numpy array as read from
+    parquet or Arrow) is accepted; a missing cell means no capabilities.
+    Strings are rejected rather than guessed at: split joined values into
+    a list first.
+    """
+    if caps is None or (isinstance(caps, float) and math.isnan(caps)):
+        return []
+    if isinstance(caps, (str, bytes)):
+        raise TypeError(
+            f"capabilities must be a list of strings, got the string "
+            f"{caps!r}; split it into a list first")
+    try:
+        return [str(cap) for cap in caps]
+    except TypeError:
+        raise TypeError(f"capabilities must be a list of strings, got "
+                        f"{type(caps).__name__}") from None
 
 
 class ThresholdMatcher:
 
-    def __init__(self):
-        self.frameworks = self.load_frameworks()
-        self.eu_requirements = self.load_eu_requirements()
-        self.compute_thresholds = self.load_compute_thresholds()
+    # Historical data versions kept compiled for as_of queries
+    HISTORY_CACHE_SIZE = 8
+
+    def __init__(self, cache_size=1024, root='.', use_snapshot=True,
+                 metrics=False):
+        self.root = root
+        self.use_snapshot = use_snapshot
+        self.cache = AssessmentCache(cache_size)
+        # Stage timings and counters; off unless asked for (see export_metrics)
+        self.metrics = MatcherMetrics(enabled=metrics)
+        self._reload_lock = threading.Lock()
+        self.versions = VersionStore(self._path(VERSIONS_DIR))
+        self._history = OrderedDict()
+        self._history_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher = None
+        self._data_signature = self._file_signature()
+        self._data = self._load_data()
+
+    # Readers take one reference to the current data and use it throughout,
+    # so a concurrent reload never hands them a mix of old and new data
+    @property
+    def frameworks(self):
+        return self._data.frameworks
+
+    @property
+    def capability_taxonomy(self):
+        return self._data.capability_taxonomy
+
+    @property
+    def eu_requirements(self):
+        return self._data.eu_requirements
+
+    @property
+    def compute_thresholds(self):
+        return self._data.compute_thresholds
+
+    @property
+    def tier_index(self):
+        return self._data.tier_index
+
+    @property
+    def reverse_index(self):
+        return self._data.reverse_index
+
+    @property
+    def data_version(self):
+        return self._data.version
+
+    def _path(self, path):
+        return os.path.join(self.root, path)
+
+    def _source_digest(self):
+        return source_digest([self._path(path) for path in SOURCE_FILES])
+
+    def _load_data(self):
+        """Load the snapshot if it is current, otherwise compile the JSON"""
+        if self.use_snapshot:
+            data = read_snapshot(self._path(SNAPSHOT_PATH),
+                                 self._source_digest())
+            if data is not None:
+                return data
+        return self._load_json_data()
+
+    def _load_json_data(self):
+        """Load and compile all JSON data files"""
+        return MatcherData(self.load_frameworks(),
+                           self.load_capability_taxonomy(),
+                           self.load_eu_requirements(),
+                           self.load_compute_thresholds())
+
+    def build_snapshot(self):
+        """Validate the JSON data and write a binary snapshot of it
+
+        Run after every extraction so later starts skip parsing and
+        compiling the JSON. Returns the snapshot path.
+        """
+        digest = self._source_digest()
+        path = self._path(SNAPSHOT_PATH)
+        write_snapshot(self._load_json_data(), path, digest)
+        return path
+
+    def data_as_of(self, when):
+        """Matcher data as recorded at a past date or datetime
+
+        when is a date, datetime or ISO string; a plain date covers the
+        whole day. Raises ValueError if no version was recorded by then.
+        """
+        version = self.versions.version_at(when)
+        if version is None:
+            raise ValueError(f"No data version recorded on or before {when}")
+        return self._data_for_version(version)
+
+    def _data_for_version(self, version):
+        with self._history_lock:
+            data = self._history.get(version)
+            if data is None:
+                data = self.versions.load(version)
+                if len(self._history) >= self.HISTORY_CACHE_SIZE:
+                    self._history.popitem(last=False)
+                self._history[version] = data
+            else:
+                self._history.move_to_end(version)
+            return data
+
+    def record_version(self):
+        """Record the current data files as a new version if they changed"""
+        return self.versions.record(self.load_frameworks(),
+                                    self.load_eu_requirements(),
+                                    self.load_compute_thresholds(),
+                                    self.load_capability_taxonomy())
+
+    def _file_signature(self):
+        """Modification time and size of each data file (None if missing)"""
+        signature = []
+        for path in DATA_FILES:
+            try:
+                stat = os.stat(self._path(path))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload(self):
+        """Rebuild data from disk and swap it in atomically
+
+        Returns False without swapping if the files changed while they were
+        being read (e.g. an extraction run still writing them).
+        """
+        with self._reload_lock:
+            timer = self.metrics.timer()
+            signature = self._file_signature()
+            data = self._load_data()
+            if self._file_signature() != signature:
+                timer.count('reloads_skipped')
+                timer.done('reload')
+                return False
+            self._data = data
+            self._data_signature = signature
+            timer.done('reload')
+            return True
+
+    def reload_if_changed(self):
+        """Reload if any data file changed since the last load"""
+        signature = self._file_signature()
+        if signature == self._data_signature:
+            return False
+        try:
+            return self.reload()
+        except Exception as e:
+            # Files that parse but are malformed fail in compilation with
+            # any error type. Don't retry until the files change again
+            self._data_signature = signature
+            print(f"⚠️ Reload failed, keeping current data: {e}")
+            return False
+
+    def start_watching(self, interval=5.0):
+        """Poll the data files in a background thread and hot-reload them"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=self._watch,
+                                         args=(interval, ),
+                                         name='threshold-data-watcher',
+                                         daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background reload thread"""
+        self._watch_stop.set()
+        if self._watcher:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval):
+        while not self._watch_stop.wait(interval):
+            try:
+                if self.reload_if_changed():
+                    print(f"🔄 Reloaded threshold data ({self.data_version})")
+            except Exception as e:
+                # Keep the thread, and the current data, alive
+                print(f"⚠️ Threshold data watcher error: {e}")
 
     def load_frameworks(self):
         """Load extracted framework data"""
         try:
-            with open('data/processed/frameworks.json', 'r') as f:
+            with open(self._path(FRAMEWORKS_PATH), 'r') as f:
                 data = json.load(f)
                 return data.get('frameworks', [])
         except FileNotFoundError:
             print("⚠️ frameworks.json not found, using empty list")
             return []
 
+    def load_capability_taxonomy(self):
+        """Load capability families used for capability matching"""
+        try:
+            with open(self._path(CAPABILITY_TAXONOMY_PATH), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print("⚠️ capability_taxonomy.json not found, using defaults")
+            return DEFAULT_TAXONOMY
+
     def load_eu_requirements(self):
         """Load EU compliance data"""
         try:
-            with open('data/processed/eu_compliance.json', 'r') as f:
+            with open(self._path(EU_COMPLIANCE_PATH), 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
             print("⚠️ eu_compliance.json not found, using defaults")
@@ -40,7 +283,7 @@ class ThresholdMatcher:
     def load_compute_thresholds(self):
         """Load compute threshold data"""
         try:
-            with open('data/processed/compute_thresholds.json', 'r') as f:
+            with open(self._path(COMPUTE_THRESHOLDS_PATH), 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
             print("⚠️ compute_thresholds.json not found, using defaults")
@@ -52,64 +295,404 @@ class ThresholdMatcher:
                 }]
             }
 
-    def assess_model(self, model_specs: ModelSpecs) -> RiskAssessment:
-        """Assess a model against all frameworks"""
+    def assess_model(self,
+                     model_specs: ModelSpecs,
+                     use_cache: bool = True,
+                     as_of=None) -> RiskAssessment:
+        """Assess a model against all frameworks
+
+        With as_of (a date, datetime or ISO string), the model is assessed
+        against the data version recorded at that time instead.
+        """
 
-        assessments = {}
+        if as_of is None:
+            data = self._data
+        else:
+            data = self.data_as_of(as_of)
+            # The cache only holds entries for the current data
+            use_cache = False
+        timer = self.metrics.timer()
 
-        # Check each framework
-        for framework in self.frameworks:
-            tier = self._match_to_framework(model_specs, framework)
-            if tier:
-                framework_name = framework.get(
-                    'framework_name', framework.get('organization', 'Unknown'))
-                assessments[framework_name] = tier
+        if use_cache:
+            key = model_specs_key(model_specs)
+            cached = self.cache.get(key, data.version)
+            timer.lap('cache_lookup')
+            if cached is not None:
+                timer.done('assess_model')
+                return self._copy_assessment(cached, model_specs.name)
+
+        # Match against the tier index compiled at load
+        assessments = data.tier_index.assess(model_specs)
+        timer.lap('tier_matching')
+        timer.count('frameworks_scanned', len(data.tier_index))
 
         # Check EU compliance
-        eu_compliant, eu_reqs = self._check_eu_compliance(model_specs)
+        eu_compliant, eu_reqs = self._check_eu_compliance(model_specs, data)
+        timer.lap('eu_compliance')
 
         # Identify gaps
         gaps = self._identify_gaps(assessments)
+        timer.lap('identify_gaps')
+
+        assessment = RiskAssessment(model_name=model_specs.name,
+                                    framework_assessments=assessments,
+                                    eu_compliant=eu_compliant,
+                                    eu_requirements=eu_reqs,
+                                    gaps_identified=gaps)
+        timer.lap('build_assessment')
 
-        return RiskAssessment(model_name=model_specs.name,
-                              framework_assessments=assessments,
-                              eu_compliant=eu_compliant,
-                              eu_requirements=eu_reqs,
-                              gaps_identified=gaps)
+        if use_cache:
+            self.cache.put(key,
+                           self._copy_assessment(assessment,
+                                                 assessment.model_name),
+                           data.version)
+        timer.done('assess_model')
+        return assessment
+
+    @staticmethod
+    def _copy_assessment(assessment, model_name):
+        """Copy an already validated assessment without re-validating it"""
+        return RiskAssessment.model_construct(
+            model_name=model_name,
+            framework_assessments=dict(assessment.framework_assessments),
+            eu_compliant=assessment.eu_compliant,
+            eu_requirements=list(assessment.eu_requirements),
+            gaps_identified=list(assessment.gaps_identified))
+
+    def export_metrics(self, format='prometheus'):
+        """Snapshot of matcher metrics as Prometheus text or JSON
+
+        Stage latencies and counters are only recorded when the matcher
+        was created with metrics=True (or metrics.enabled is set); cache
+        and data gauges are always included.
+        """
+        data = self._data
+        cache = self.cache.info()
+        gauges = {
+            'cache_hits': cache['hits'],
+            'cache_misses': cache['misses'],
+            'cache_hit_ratio': cache['hit_ratio'],
+            'cache_entries': cache['size'],
+            'frameworks': len(data.tier_index),
+            'tiers': int(data.tier_index.tier_counts.sum()),
+            'data_info': (1, {'version': data.version}),
+        }
+        if format == 'json':
+            gauges['data_info'] = data.version
+            return self.metrics.to_json(gauges)
+        if format == 'prometheus':
+            return self.metrics.to_prometheus(gauges)
+        raise ValueError(f"Unknown metrics format: {format}")
+
+    def cache_info(self):
+        """Assessment cache hit/miss statistics"""
+        return self.cache.info()
+
+    def compute_breakpoints(self, capabilities=()):
+        """Compute values at which any framework or the EU flag changes
+
+        Returns a ComputeSweep for a model with the given capabilities,
+        describing its assessment at every training compute.
+        """
+        data = self._data
+        return compute_sweep(data.tier_index, capabilities,
+                             data.compute_index.eu_threshold)
+
+    def thresholds_crossed(self, flops, as_of=None):
+        """Every regulatory and framework compute threshold flops reaches
+
+        One entry per threshold, lowest first, with keys flops, kind
+        ('eu_ai_act', 'regulation' or 'framework'), source, tier,
+        tier_level and triggers.
+        """
+        data = self._data if as_of is None else self.data_as_of(as_of)
+        return data.compute_index.crossed(flops)
+
+    def eu_compliance(self, model_specs, as_of=None):
+        """(compliant, required evaluations) under the EU AI Act
+
+        A model past the systemic-risk compute threshold is not compliant
+        until it meets the listed evaluations.
+        """
+        data = self._data if as_of is None else self.data_as_of(as_of)
+        return self._check_eu_compliance(model_specs, data)
+
+    def tiers_for_capability(self, capability):
+        """Framework tiers triggered by a capability or taxonomy family
+
+        Each entry has framework, tier, tier_level and
+        compute_threshold_flops, in framework and tier order.
+        """
+        return self._data.reverse_index.tiers_for_capability(capability)
+
+    def tiers_requiring_evaluation(self, evaluation):
+        """Framework tiers listing evaluation among their requirements"""
+        return self._data.reverse_index.tiers_for_evaluation(evaluation)
+
+    def thresholds_crossed_many(self, computes, as_of=None) -> pd.DataFrame:
+        """thresholds_crossed for an array of compute values at once
+
+        Returns a long DataFrame with an item column giving the position
+        of the compute value in computes.
+        """
+        data = self._data if as_of is None else self.data_as_of(as_of)
+        return data.compute_index.crossed_many(computes)
+
+    def project_effective_compute(self, models, years=10, start=None,
+                                  trained_on=None, kinds=REGULATORY_KINDS,
+                                  rate=None, as_of=None):
+        """Project a batch of models' effective compute over time
+
+        models takes the same forms as in assess_many. Effective compute
+        grows by the algorithmic efficiency rate of compute_thresholds.json
+        (unless rate is given) over a monthly grid of years from the month
+        of start (default today). trained_on optionally gives each model's
+        training date (default the start of the grid). Crossing dates are
+        solved for every threshold of the given kinds; pass kinds=None to
+        include framework tiers.
+        """
+        data = self._data if as_of is None else self.data_as_of(as_of)
+        names, computes, _ = self._batch_columns(models)
+        if rate is None:
+            rate = annual_improvement_rate(data.compute_thresholds)
+        thresholds = [
+            entry for entry in data.compute_index.entries
+            if kinds is None or entry['kind'] in kinds
+        ]
+        return EffectiveComputeProjection(names, computes, thresholds, rate,
+                                          start, years, trained_on)
+
+    def assess_many(self, models, as_of=None, workers=None,
+                    shard=SHARD_MODELS) -> pd.DataFrame:
+        """Assess a batch of models against all frameworks at once
+
+        models is a list of ModelSpecs or a DataFrame with ModelSpecs
+        columns (name, training_compute_flops, capabilities, ...). Returns
+        one row per model indexed by name: a column per framework holding
+        the matched tier, then eu_compliant and the gap columns
+        frameworks_triggered, frameworks_not_triggered, distinct_tiers,
+        tiers_disagree and trigger_split. as_of works as in assess_model.
+
+        workers spreads matching over a process pool (0 for every core),
+        split into blocks of models or, with shard='frameworks', of
+        frameworks. The result is the same as without workers.
+        """
+
+        data = self._data if as_of is None else self.data_as_of(as_of)
+        timer = self.metrics.timer()
+        names, computes, framework_names, codes, _ = self._batch_outcomes(
+            data, models, workers, shard)
+        timer.lap('batch_matching')
+        timer.count('models_assessed', len(names))
+        matched = codes != UNNAMED_TIER
+        triggered = matched & (codes != BELOW_THRESHOLD_CODE)
+
+        result = pd.DataFrame(data.tier_index.tier_labels[codes],
+                              index=pd.Index(names, name='model_name'),
+                              columns=framework_names)
+
+        crosses_eu = data.compute_index.crosses_eu_threshold_many(computes)
+        result['eu_compliant'] = ~crosses_eu
+
+        result['frameworks_triggered'] = triggered.sum(axis=1)
+        result['frameworks_not_triggered'] = (matched & ~triggered).sum(axis=1)
+        result['distinct_tiers'] = self._count_distinct(
+            np.where(triggered, codes, 0))
+        result['tiers_disagree'] = result['distinct_tiers'] > 1
+        result['trigger_split'] = (result['frameworks_triggered'] > 0) & (
+            result['frameworks_not_triggered'] > 0)
+        timer.done('assess_many')
+        return result
+
+    def assess_batch(self, models, use_cache=True) -> list:
+        """assess_model for a list of ModelSpecs in one batched pass
+
+        Returns a RiskAssessment per model, in order, equal to what
+        assess_model gives. Cached models are answered from the cache and
+        the rest are matched together.
+        """
+        data = self._data
+        timer = self.metrics.timer()
+        results = [None] * len(models)
+        keys = [model_specs_key(spec) for spec in models]
+        if use_cache:
+            for i, key in enumerate(keys):
+                cached = self.cache.get(key, data.version)
+                if cached is not None:
+                    results[i] = self._copy_assessment(cached, models[i].name)
+        timer.lap('cache_lookup')
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            _, computes, framework_names, codes, _ = self._batch_outcomes(
+                data, [models[i] for i in pending])
+            timer.lap('batch_matching')
+            labels = data.tier_index.tier_labels
+            matched = codes != UNNAMED_TIER
+            eu_data = data.eu_requirements.get('eu_ai_act', {})
+            crosses_eu = data.compute_index.crosses_eu_threshold_many(
+                computes).tolist()
+            for row, i in enumerate(pending):
+                assessments = {
+                    name: labels[code]
+                    for name, code, hit in zip(framework_names,
+                                               codes[row].tolist(),
+                                               matched[row].tolist()) if hit
+                }
+                eu_compliant = not crosses_eu[row]
+                assessment = RiskAssessment.model_construct(
+                    model_name=models[i].name,
+                    framework_assessments=assessments,
+                    eu_compliant=eu_compliant,
+                    eu_requirements=[] if eu_compliant else list(
+                        eu_data.get('required_evaluations', [])),
+                    gaps_identified=self._identify_gaps(assessments))
+                if use_cache:
+                    self.cache.put(keys[i],
+                                   self._copy_assessment(
+                                       assessment, assessment.model_name),
+                                   data.version)
+                results[i] = assessment
+            timer.lap('build_assessment')
+        timer.count('models_assessed', len(models))
+        timer.done('assess_batch')
+        return results
+
+    def portfolio_gaps(self, models, as_of=None, workers=None,
+                       shard=SHARD_MODELS) -> PortfolioGaps:
+        """Cross-framework disagreement statistics for a batch of models
+
+        models, workers and shard work as in assess_many. The result holds
+        framework x framework matrices of normalized tier-level gaps and
+        trigger splits, and ranks the most divergent framework pairs.
+        """
+        data = self._data if as_of is None else self.data_as_of(as_of)
+        timer = self.metrics.timer()
+        names, _, framework_names, codes, levels = self._batch_outcomes(
+            data, models, workers, shard)
+        timer.lap('batch_matching')
+        timer.count('models_assessed', len(names))
+        matched = codes != UNNAMED_TIER
+        triggered = matched & (codes != BELOW_THRESHOLD_CODE)
+        gaps = PortfolioGaps(names, framework_names, levels, matched,
+                             triggered)
+        timer.done('portfolio_gaps')
+        return gaps
+
+    def update_results(self, store, models=None):
+        """Incrementally bring a ResultStore up to date with the current data
+
+        models (as in assess_many) replaces the store's registry. Only
+        cells whose framework or model specs changed are recomputed; the
+        store is then saved. Returns what was recomputed.
+        """
+        specs = models
+        if isinstance(models, pd.DataFrame):
+            names, computes, capability_sets = self._batch_columns(models)
+            specs = [
+                ModelSpecs.model_construct(name=name,
+                                           training_compute_flops=compute,
+                                           parameters=None,
+                                           passed_evaluations=[],
+                                           capabilities=list(capabilities))
+                for name, compute, capabilities in zip(
+                    names, computes.tolist(), capability_sets)
+            ]
+        timer = self.metrics.timer()
+        summary = store.update(self._data, specs)
+        timer.lap('incremental_update')
+        store.save()
+        timer.done('update_results')
+        return summary
+
+    def assess_history(self, model_specs: ModelSpecs) -> pd.DataFrame:
+        """A model's tier in every framework at each recorded data version
+
+        One row per version (indexed by version, with its created_at), one
+        column per framework name ever seen, plus eu_compliant. Frameworks
+        absent from a version are left empty.
+        """
+        rows = []
+        for entry in self.versions.versions():
+            data = self._data_for_version(entry['version'])
+            row = {'version': entry['version'],
+                   'created_at': entry['created_at']}
+            row.update(data.tier_index.assess(model_specs))
+            row['eu_compliant'] = self._check_eu_compliance(model_specs,
+                                                            data)[0]
+            rows.append(row)
+        history = pd.DataFrame(rows)
+        if rows:
+            history = history.set_index('version')
+            history = history[[c for c in history if c != 'eu_compliant'] +
+                              ['eu_compliant']]
+        return history
+
+    def _batch_outcomes(self, data, models, workers=None, shard=SHARD_MODELS):
+        """Tier codes and normalized levels for a batch of models
+
+        Returns names, computes, the framework names, and M x F arrays of
+        tier codes and normalized tier levels, one column per framework
+        name. With workers other than None or 1, matching is sharded across
+        a process pool (workers=0 uses every core).
+        """
+        tier_index = data.tier_index
+        names, computes, capability_sets = self._batch_columns(models)
+
+        if workers is not None and workers != 1:
+            codes, levels = sharded_outcomes(tier_index, computes,
+                                             capability_sets, workers, shard)
+            framework_names, codes, levels = tier_index.collapse_names(
+                codes, levels)
+        else:
+            framework_names, codes, levels = tier_index.batch_outcomes(
+                computes, capability_sets)
+        return names, computes, framework_names, codes, levels
+
+    @staticmethod
+    def _batch_columns(models):
+        """Pull names, compute and capability lists out of a model batch"""
+        if isinstance(models, pd.DataFrame):
+            names = (models['name'].astype(str).tolist()
+                     if 'name' in models else [str(i) for i in models.index])
+            computes = models['training_compute_flops'].to_numpy(dtype=float)
+            if 'capabilities' in models:
+                capability_sets = [
+                    _capability_list(caps) for caps in models['capabilities']
+                ]
+            else:
+                capability_sets = [[] for _ in names]
+        else:
+            names = [spec.name for spec in models]
+            computes = np.array(
+                [spec.training_compute_flops for spec in models], dtype=float)
+            capability_sets = [spec.capabilities for spec in models]
+        return names, computes, capability_sets
+
+    @staticmethod
+    def _count_distinct(codes):
+        """Number of distinct non-zero tier codes in each row"""
+        codes = np.sort(codes, axis=1)
+        starts = np.diff(codes, axis=1, prepend=0) != 0
+        return starts.sum(axis=1)
 
     def _match_to_framework(self, model_specs, framework):
         """Match model to appropriate tier in a framework"""
 
-        # Sort tiers by level (highest first)
-        tiers = sorted(framework.get('risk_tiers', []),
-                       key=lambda x: x.get('tier_level', 0),
-                       reverse=True)
-
-        for tier in tiers:
-            # Check compute threshold
-            compute_threshold = tier.get('compute_threshold_flops')
-            if compute_threshold and model_specs.training_compute_flops >= compute_threshold:
-                return tier.get('tier_name')
-
-            # Check capability matches
-            capability_threshold = tier.get('capability_threshold', '').lower()
-            for capability in model_specs.capabilities:
-                if capability.lower() in capability_threshold or \
-                   'cbrn' in capability.lower() and 'cbrn' in capability_threshold or \
-                   'cyber' in capability.lower() and 'cyber' in capability_threshold or \
-                   'autonom' in capability.lower() and 'autonom' in capability_threshold or \
-                   'persuasion' in capability.lower() and 'persuasion' in capability_threshold:
-                    return tier.get('tier_name')
-
-        return "Below threshold"
-
-    def _check_eu_compliance(self, model_specs):
+        index = TierIndex([framework], self._data.capability_taxonomy)
+        capability_position = index.capability_positions(
+            model_specs.capabilities)[0]
+        return index.frameworks[0].match(model_specs.training_compute_flops,
+                                         capability_position)
+
+    def _check_eu_compliance(self, model_specs, data=None):
         """Check if model needs EU AI Act compliance"""
 
-        eu_data = self.eu_requirements.get('eu_ai_act', {})
-        threshold = eu_data.get('compute_threshold_flops', 1e25)
+        data = data or self._data
+        eu_data = data.eu_requirements.get('eu_ai_act', {})
 
-        if model_specs.training_compute_flops >= threshold:
+        if data.compute_index.crosses_eu_threshold(
+                model_specs.training_compute_flops):
             # Model exceeds threshold - NOT compliant (needs to take actions)
             return False, eu_data.get('required_evaluations', [])
 
@@ -126,7 +709,7 @@ class ThresholdMatcher:
 
         if len(unique_tiers) > 1:
             # Check if disagreement is meaningful (not just "Below threshold" vs actual tier)
-            actual_tiers = [t for t in unique_tiers if t != "Below threshold"]
+            actual_tiers = [t for t in unique_tiers if t != BELOW_THRESHOLD]
             if len(actual_tiers) > 1:
                 gaps.append(
                     f"Frameworks disagree on risk level: {', '.join(actual_tiers)}"
@@ -134,10 +717,10 @@ class ThresholdMatcher:
 
         # Check if some frameworks trigger but others don't
         triggered = [
-            k for k, v in assessments.items() if v != "Below threshold"
+            k for k, v in assessments.items() if v != BELOW_THRESHOLD
         ]
         not_triggered = [
-            k for k, v in assessments.items() if v == "Below threshold"
+            k for k, v in assessments.items() if v == BELOW_THRESHOLD
         ]
 
         if triggered and not_triggered:
@@ -0,0 +1,342 @@
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from analysis.capability_matcher import CapabilityMatcher
+from analysis.framework_store import StringPool
+
+BELOW_THRESHOLD = "Below threshold"
+
+# Tier codes used by the batch tables (see TierIndex.tier_labels)
+BELOW_THRESHOLD_CODE = 0
+UNNAMED_TIER = 1
+
+
+def _as_flops(value):
+    """Coerce an extracted compute threshold to a float, or None if unusable"""
+    try:
+        flops = float(value)
+    except (TypeError, ValueError):
+        return None
+    # A zero threshold never triggered a tier in the original matcher
+    return flops if flops else None
+
+
+class CompiledFramework:
+    """One framework's tiers, pre-sorted and pre-processed for matching
+
+    Tiers are stored highest level first (ties keep extraction order), which
+    is the order the matcher walks them in. Compute thresholds are held as a
+    running minimum over that order, negated so that the first tier a model's
+    compute reaches can be found with a single bisect.
+    """
+
+    __slots__ = ('name', 'tier_names', 'tier_levels', 'tier_texts',
+                 'tier_flops', 'neg_min_flops')
+
+    def __init__(self, framework, pool=None):
+        pool = pool if pool is not None else StringPool()
+        self.name = framework.get('framework_name',
+                                  framework.get('organization', 'Unknown'))
+
+        tiers = sorted(framework.get('risk_tiers', []),
+                       key=lambda x: x.get('tier_level') or 0,
+                       reverse=True)
+
+        self.tier_names = [tier.get('tier_name') for tier in tiers]
+        self.tier_levels = array('d', [tier.get('tier_level') or 0 for tier in tiers])
+        self.tier_texts = [
+            pool.intern((tier.get('capability_threshold') or '').lower())
+            for tier in tiers
+        ]
+
+        # Each tier's own compute threshold (nan if none), and the running
+        # minimum the matcher bisects
+        self.tier_flops = array('d')
+        self.neg_min_flops = array('d')
+        running_min = float('inf')
+        for tier in tiers:
+            flops = _as_flops(tier.get('compute_threshold_flops'))
+            self.tier_flops.append(float('nan') if flops is None else flops)
+            if flops is not None and flops < running_min:
+                running_min = flops
+            self.neg_min_flops.append(-running_min)
+
+    def __len__(self):
+        return len(self.tier_names)
+
+    def compute_position(self, training_compute_flops):
+        """First tier position whose compute threshold the model reaches
+
+        An unknown (NaN) compute reaches none, as with >= comparisons.
+        """
+        if training_compute_flops != training_compute_flops:
+            return len(self.neg_min_flops)
+        return bisect_left(self.neg_min_flops, -training_compute_flops)
+
+    def match(self, training_compute_flops, capability_position):
+        """Return the tier name a model falls into, or Below threshold"""
+        position = min(self.compute_position(training_compute_flops),
+                       capability_position)
+        if position < len(self.tier_names):
+            return self.tier_names[position]
+        return BELOW_THRESHOLD
+
+
+class TierIndex:
+    """Frameworks compiled once at load for repeated model assessment"""
+
+    # Upper bound on model x framework x tier cells compared at once
+    BATCH_CELLS = 4_000_000
+
+    def __init__(self, frameworks, taxonomy=None, pool=None):
+        pool = pool if pool is not None else StringPool()
+        self.frameworks = [CompiledFramework(fw, pool) for fw in frameworks]
+        self._build_tables(taxonomy)
+
+    def _build_tables(self, taxonomy, family_tiers=None):
+        self.taxonomy = taxonomy
+        # Every tier gets a global id, in framework order then tier order, so
+        # one capability lookup covers all frameworks at once
+        self.tier_counts = np.array([len(fw) for fw in self.frameworks],
+                                    dtype=np.intp)
+        self.tier_framework = np.repeat(np.arange(len(self.frameworks)),
+                                        self.tier_counts)
+        offsets = np.cumsum(self.tier_counts) - self.tier_counts
+        self.tier_position = (np.arange(self.tier_counts.sum()) -
+                              np.repeat(offsets, self.tier_counts))
+        self.capabilities = CapabilityMatcher(
+            [text for fw in self.frameworks for text in fw.tier_texts],
+            taxonomy, family_tiers)
+
+        # Padded framework x tier tables for batch assessment. Padding never
+        # exceeds a model's compute, and the extra last column of tier codes
+        # is what a position past the final tier resolves to. Tier names are
+        # dictionary-encoded: code 0 is Below threshold, code 1 an unnamed
+        # tier, and codes from 2 index the distinct names in tier_labels.
+        width = max((len(fw) for fw in self.frameworks), default=0)
+        self.tier_labels = [BELOW_THRESHOLD, None]
+        codes = {}
+        self.min_flops = np.full((len(self.frameworks), width), -np.inf)
+        self.tier_code_table = np.zeros((len(self.frameworks), width + 1),
+                                        dtype=np.intp)
+        # Tier levels scaled to each framework's highest level, so frameworks
+        # with different numbers of tiers can be compared (0 is Below
+        # threshold)
+        self.tier_level_table = np.zeros((len(self.frameworks), width + 1))
+        for i, framework in enumerate(self.frameworks):
+            self.min_flops[i, :len(framework)] = np.negative(
+                framework.neg_min_flops)
+            levels = np.asarray(framework.tier_levels)
+            top = levels.max(initial=0)
+            if top > 0:
+                self.tier_level_table[i, :len(framework)] = levels / top
+            for j, name in enumerate(framework.tier_names):
+                if name is None:
+                    self.tier_code_table[i, j] = UNNAMED_TIER
+                    continue
+                if name not in codes:
+                    codes[name] = len(self.tier_labels)
+                    self.tier_labels.append(name)
+                self.tier_code_table[i, j] = codes[name]
+        self.tier_labels = np.array(self.tier_labels, dtype=object)
+
+    def to_arrays(self):
+        """Flat arrays and string lists describing the compiled index"""
+        families = self.capabilities.family_tiers
+        return {
+            'framework_names': [fw.name for fw in self.frameworks],
+            'tier_counts': self.tier_counts,
+            'tier_names': [name for fw in self.frameworks for name in fw.tier_names],
+            'tier_texts': self.capabilities.tier_texts,
+            'tier_levels': np.concatenate(
+                [np.asarray(fw.tier_levels) for fw in self.frameworks] or [[]]),
+            'tier_flops': np.concatenate(
+                [np.asarray(fw.tier_flops) for fw in self.frameworks] or [[]]),
+            'neg_min_flops': np.concatenate(
+                [np.asarray(fw.neg_min_flops) for fw in self.frameworks] or [[]]),
+            'family_names': list(families),
+            'family_tier_counts': np.array(
+                [len(tiers) for tiers in families.values()], dtype=np.intp),
+            'family_tier_ids': np.array(
+                [tier for tiers in families.values() for tier in sorted(tiers)],
+                dtype=np.intp),
+        }
+
+    @classmethod
+    def from_compiled(cls, compiled_frameworks, taxonomy=None):
+        """Build an index over already compiled frameworks
+
+        CompiledFramework objects are never modified, so several indexes
+        (e.g. for different data versions) can share them.
+        """
+        index = cls.__new__(cls)
+        index.frameworks = list(compiled_frameworks)
+        index._build_tables(taxonomy)
+        return index
+
+    @classmethod
+    def from_arrays(cls, arrays, taxonomy=None):
+        """Rebuild an index from to_arrays() output without recompiling
+
+        The string lists are used as given, so they should already be
+        deduplicated (as a decoded string table is).
+        """
+        index = cls.__new__(cls)
+        index.frameworks = []
+        start = 0
+        for name, count in zip(arrays['framework_names'],
+                               arrays['tier_counts'].tolist()):
+            end = start + count
+            framework = CompiledFramework.__new__(CompiledFramework)
+            framework.name = name
+            framework.tier_names = arrays['tier_names'][start:end]
+            framework.tier_levels = array('d', arrays['tier_levels'][start:end])
+            framework.tier_texts = arrays['tier_texts'][start:end]
+            framework.tier_flops = array('d', arrays['tier_flops'][start:end])
+            framework.neg_min_flops = array('d',
+                                            arrays['neg_min_flops'][start:end])
+            index.frameworks.append(framework)
+            start = end
+
+        family_tiers = {}
+        start = 0
+        for family, count in zip(arrays['family_names'],
+                                 arrays['family_tier_counts'].tolist()):
+            family_tiers[family] = set(
+                arrays['family_tier_ids'][start:start + count].tolist())
+            start += count
+        index._build_tables(taxonomy, family_tiers)
+        return index
+
+    def __len__(self):
+        return len(self.frameworks)
+
+    def capability_positions(self, capabilities):
+        """First tier position touched in every framework by a capability set
+
+        Frameworks the capabilities do not touch get their tier count, which
+        resolves to Below threshold.
+        """
+        positions = self.tier_counts.copy()
+        touched = self.capabilities.touched(capabilities)
+        if touched:
+            ids = np.fromiter(touched, dtype=np.intp, count=len(touched))
+            np.minimum.at(positions, self.tier_framework[ids],
+                          self.tier_position[ids])
+        return positions
+
+    def batch_capability_positions(self, capability_sets):
+        """capability_positions() for many models, as a table and row ids
+
+        Model registries reuse a handful of capability sets, so each
+        distinct set is resolved once. Returns a K x F array with a row per
+        distinct set and a length-M array giving each model's row.
+        """
+        rows = {}
+        ids = np.empty(len(capability_sets), dtype=np.intp)
+        for i, capabilities in enumerate(capability_sets):
+            ids[i] = rows.setdefault(frozenset(capabilities), len(rows))
+        table = np.empty((len(rows), len(self.frameworks)), dtype=np.intp)
+        for key, row in rows.items():
+            table[row] = self.capability_positions(key)
+        return table, ids
+
+    def batch_positions(self, computes, capability_positions,
+                        frameworks=slice(None)):
+        """Matched tier positions for many models at once
+
+        computes is a length-M array of training FLOPs and
+        capability_positions an M x F array from capability_positions().
+        Returns an M x F array of tier positions, where a framework's tier
+        count means Below threshold. frameworks restricts the work to a
+        slice of the frameworks, capability_positions then holding just
+        their columns.
+        """
+        min_flops = self.min_flops[frameworks]
+        n_models = len(computes)
+        n_frameworks, width = min_flops.shape
+        positions = np.empty((n_models, n_frameworks), dtype=np.intp)
+
+        step = max(1, self.BATCH_CELLS // max(1, n_frameworks * width))
+        for start in range(0, n_models, step):
+            # NaN compute reaches no threshold; as -inf it counts every
+            # real tier as still above it
+            chunk = np.nan_to_num(computes[start:start + step, None, None],
+                                  nan=-np.inf, posinf=np.inf, neginf=-np.inf)
+            # Running minima are non-increasing, so tiers still above the
+            # model's compute form a prefix whose length is the position
+            compute_positions = (min_flops[None, :, :] > chunk).sum(axis=2)
+            np.minimum(compute_positions,
+                       capability_positions[start:start + step],
+                       out=positions[start:start + step])
+        return positions
+
+    def batch_tier_codes(self, positions, frameworks=slice(None)):
+        """Resolve an M x F array of tier positions to tier codes"""
+        table = self.tier_code_table[frameworks]
+        return table[np.arange(len(table))[None, :], positions]
+
+    def batch_tier_levels(self, positions, frameworks=slice(None)):
+        """Resolve an M x F array of tier positions to normalized levels"""
+        table = self.tier_level_table[frameworks]
+        return table[np.arange(len(table))[None, :], positions]
+
+    def batch_outcomes(self, computes, capability_sets):
+        """Framework names and M x F tier codes and levels for many models
+
+        Columns are per framework name, as collapsed by collapse_names.
+        """
+        table, ids = self.batch_capability_positions(capability_sets)
+        positions = self.batch_positions(computes, table[ids])
+        return self.collapse_names(self.batch_tier_codes(positions),
+                                   self.batch_tier_levels(positions))
+
+    def collapse_names(self, codes, levels):
+        """Merge the columns of same-named frameworks
+
+        Later frameworks win unless their tier has no name, exactly as in
+        assess(). Returns the distinct framework names in first-seen order
+        and the merged code and level arrays.
+        """
+        columns = {}
+        for i, framework in enumerate(self.frameworks):
+            code, level = codes[:, i], levels[:, i]
+            if framework.name in columns:
+                earlier_code, earlier_level = columns[framework.name]
+                unnamed = code == UNNAMED_TIER
+                code = np.where(unnamed, earlier_code, code)
+                level = np.where(unnamed, earlier_level, level)
+            columns[framework.name] = code, level
+
+        if not columns:
+            return [], np.empty((len(codes), 0), dtype=np.intp), np.empty(
+                (len(codes), 0))
+        return (list(columns),
+                np.column_stack([code for code, _ in columns.values()]),
+                np.column_stack([level for _, level in columns.values()]))
+
+    def subset(self, names):
+        """Index over just the frameworks with the given names
+
+        Matching is per framework, so its outcomes equal the corresponding
+        columns of this index's.
+        """
+        return TierIndex.from_compiled(
+            [fw for fw in self.frameworks if fw.name in names],
+            self.taxonomy)
+
+    def assess(self, model_specs):
+        """Map framework name to matched tier for every framework"""
+        capability_positions = self.capability_positions(
+            model_specs.capabilities).tolist()
+        compute = model_specs.training_compute_flops
+
+        assessments = {}
+        for framework, capability_position in zip(self.frameworks,
+                                                  capability_positions):
+            tier = framework.match(compute, capability_position)
+            if tier:
+                assessments[framework.name] = tier
+        return assessments
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+
+from analysis.assessment_cache import data_version
+from analysis.framework_store import StringPool
+from analysis.matcher_data import MatcherData
+from analysis.tier_index import CompiledFramework, TierIndex
+
+VERSIONS_DIR = 'data/versions'
+
+# Documents versioned alongside the frameworks
+DOCUMENTS = ('eu_requirements', 'compute_thresholds', 'capability_taxonomy')
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'),
+                      default=str)
+
+
+def _object_hash(value):
+    return hashlib.sha256(_canonical(value).encode()).hexdigest()
+
+
+def framework_keys(frameworks):
+    """Stable identity of each framework across extraction runs
+
+    Organization, name and version identify a framework; repeats within
+    one snapshot are told apart by their occurrence number.
+    """
+    seen = {}
+    keys = []
+    for framework in frameworks:
+        key = '|'.join(
+            str(framework.get(field) or '')
+            for field in ('organization', 'framework_name', 'version'))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def _as_datetime(when):
+    """Latest instant covered by when (a whole day for plain dates)"""
+    if isinstance(when, str):
+        when = (datetime.fromisoformat(when)
+                if 'T' in when or ' ' in when.strip() else
+                date.fromisoformat(when))
+    if not isinstance(when, datetime):
+        when = datetime.combine(when + timedelta(days=1), time.min) - \
+            timedelta(microseconds=1)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when
+
+
+class VersionStore:
+    """Append-only history of the processed data with structural sharing
+
+    Every tier, framework and document is stored once as a content-hashed
+    object, a framework referencing its tiers by hash. Each version is one
+    line of history.jsonl recording only what changed since its parent:
+    frameworks set (added or changed) or removed by key, and documents
+    replaced. Resolving a version replays these small diffs and then reads
+    just the objects it references, so loading one point in time never
+    touches other full snapshots. Objects and compiled frameworks are
+    cached by hash, so versions held together share everything unchanged.
+    """
+
+    def __init__(self, path=VERSIONS_DIR):
+        self.path = path
+        self._history = []
+        self._history_signature = None
+        self._objects = {}
+        self._frameworks = {}
+        self._compiled = {}
+        self._pool = StringPool()
+        self._lock = threading.RLock()
+
+    @property
+    def _history_path(self):
+        return os.path.join(self.path, 'history.jsonl')
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, 'objects', digest[:2], f"{digest}.json")
+
+    def _refresh(self):
+        """Re-read history.jsonl if another process appended to it"""
+        try:
+            stat = os.stat(self._history_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._history_signature:
+            return
+        history = []
+        if signature is not None:
+            with open(self._history_path, 'r') as f:
+                history = [json.loads(line) for line in f if line.strip()]
+        self._history = history
+        self._history_signature = signature
+
+    def _put(self, value):
+        digest = _object_hash(value)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(_canonical(value))
+            os.replace(tmp_path, path)
+        return digest
+
+    def _get(self, digest):
+        value = self._objects.get(digest)
+        if value is None:
+            with open(self._object_path(digest), 'r') as f:
+                value = self._objects[digest] = json.load(f)
+        return value
+
+    def _put_framework(self, framework):
+        fields = {key: value for key, value in framework.items()
+                  if key != 'risk_tiers'}
+        tiers = [self._put(tier) for tier in framework.get('risk_tiers') or []]
+        return self._put({'fields': fields, 'tiers': tiers})
+
+    def _framework(self, digest):
+        """Framework dict for a hash, shared by every version holding it"""
+        framework = self._frameworks.get(digest)
+        if framework is None:
+            stored = self._get(digest)
+            framework = dict(stored['fields'])
+            framework['risk_tiers'] = [
+                self._get(tier) for tier in stored['tiers']
+            ]
+            self._frameworks[digest] = framework
+        return framework
+
+    def _frameworks_for(self, digests):
+        with self._lock:
+            return [self._framework(digest) for digest in digests]
+
+    def _compiled_framework(self, digest):
+        compiled = self._compiled.get(digest)
+        if compiled is None:
+            compiled = self._compiled[digest] = CompiledFramework(
+                self._framework(digest), self._pool)
+        return compiled
+
+    def versions(self):
+        """Summary of every recorded version, oldest first"""
+        with self._lock:
+            self._refresh()
+            return [{
+                'version': entry['version'],
+                'created_at': entry['created_at'],
+                'frameworks_set': len(entry['set']),
+                'frameworks_removed': len(entry['removed']),
+                'documents_changed': sorted(entry['documents']),
+            } for entry in self._history]
+
+    def latest(self):
+        """Number of the newest version, or None if nothing is recorded"""
+        with self._lock:
+            self._refresh()
+            return self._history[-1]['version'] if self._history else None
+
+    def version_at(self, when):
+        """Newest version created at or before when, or None"""
+        when = _as_datetime(when)
+        with self._lock:
+            self._refresh()
+            found = None
+            for entry in self._history:
+                if datetime.fromisoformat(entry['created_at']) > when:
+                    break
+                found = entry['version']
+            return found
+
+    def resolve(self, version):
+        """Framework key -> hash and document -> hash as of a version"""
+        with self._lock:
+            self._refresh()
+            if not 1 <= version <= len(self._history):
+                raise KeyError(f"Unknown data version: {version}")
+            frameworks = {}
+            documents = {}
+            for entry in self._history[:version]:
+                for key in entry['removed']:
+                    frameworks.pop(key, None)
+                frameworks.update(entry['set'])
+                documents.update(entry['documents'])
+            return frameworks, documents
+
+    def record(self, frameworks, eu_requirements, compute_thresholds,
+               capability_taxonomy, created_at=None):
+        """Store the given data as a new version if anything changed
+
+        Returns the new version number, or None when the data is identical
+        to the latest version.
+        """
+        with self._lock:
+            self._refresh()
+            latest = self.latest()
+            previous, previous_documents = ({}, {}) if latest is None else \
+                self.resolve(latest)
+
+            current = {
+                key: self._put_framework(framework)
+                for key, framework in zip(framework_keys(frameworks),
+                                          frameworks)
+            }
+            documents = {
+                name: self._put(value)
+                for name, value in zip(DOCUMENTS, (
+                    eu_requirements, compute_thresholds, capability_taxonomy))
+            }
+
+            created_at = created_at or datetime.now(timezone.utc)
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            entry = {
+                'version': len(self._history) + 1,
+                'created_at': created_at.isoformat(),
+                'set': {
+                    key: digest for key, digest in current.items()
+                    if previous.get(key) != digest
+                },
+                'removed': [key for key in previous if key not in current],
+                'documents': {
+                    name: digest for name, digest in documents.items()
+                    if previous_documents.get(name) != digest
+                },
+            }
+            if not (entry['set'] or entry['removed'] or entry['documents']):
+                return None
+
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._history_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._refresh()
+            return entry['version']
+
+    def diff(self, old, new):
+        """Framework keys added, removed and changed between two versions"""
+        before, _ = self.resolve(old)
+        after, _ = self.resolve(new)
+        return {
+            'added': [key for key in after if key not in before],
+            'removed': [key for key in before if key not in after],
+            'changed': [
+                key for key in after
+                if key in before and before[key] != after[key]
+            ],
+        }
+
+    def load(self, version):
+        """MatcherData for a version, reusing compiled unchanged frameworks"""
+        frameworks, documents = self.resolve(version)
+        with self._lock:
+            digests = list(frameworks.values())
+            compiled = [self._compiled_framework(d) for d in digests]
+            loaded = {name: self._get(documents[name]) for name in DOCUMENTS}
+            pool = self._pool
+
+        taxonomy = loaded['capability_taxonomy']
+        return MatcherData.from_compiled(
+            TierIndex.from_compiled(compiled, taxonomy),
+            lambda: self._frameworks_for(digests),
+            taxonomy,
+            loaded['eu_requirements'],
+            loaded['compute_thresholds'],
+            data_version(digests, documents),
+            pool)
+
+
+def record_version(root='.'):
+    """Record the processed data under root as a new version, if changed"""
+    from analysis.threshold_matcher import ThresholdMatcher
+
+    version = ThresholdMatcher(root=root).record_version()
+    if version is None:
+        print("🗂️ Data unchanged, no new version recorded")
+    else:
+        print(f"🗂️ Recorded data version {version}")
+    return version
+
+
+if __name__ == "__main__":
+    record_version()
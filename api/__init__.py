@@ -0,0 +1 @@
+# HTTP service for programmatic access to the threshold analysis
@@ -0,0 +1,338 @@
+"""Asyncio HTTP service for programmatic threshold assessment
+
+Run from the repository root:
+
+    python -m api.server --port 8000
+
+Endpoints (JSON in, JSON out):
+
+    POST /assess                one ModelSpecs -> RiskAssessment
+    POST /assess/batch          list of ModelSpecs -> list of RiskAssessment
+    POST /compliance            one ModelSpecs -> EU status, thresholds crossed
+    POST /gaps                  list of ModelSpecs -> framework disagreement
+    GET  /tiers/capability?q=   tiers a capability or family triggers
+    GET  /tiers/evaluation?q=   tiers requiring an evaluation
+    GET  /health                data version and cache statistics
+    GET  /metrics               Prometheus metrics of the matcher
+
+Concurrent /assess requests are coalesced into one batched assessment.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from pydantic import ValidationError
+
+from analysis.models import ModelSpecs
+from analysis.threshold_matcher import ThresholdMatcher
+
+# Longest a request waits for others to share its batch, in seconds
+BATCH_WINDOW = 0.002
+MAX_BATCH_SIZE = 512
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MicroBatcher:
+    """Coalesces single-model assessments into batched matcher calls
+
+    The first request to arrive opens a window of BATCH_WINDOW seconds;
+    everything queued by then (up to MAX_BATCH_SIZE) is assessed in one
+    assess_batch call on a worker thread. Requests arriving while a batch
+    runs simply queue up for the next one, so batches grow with load.
+    """
+
+    def __init__(self, matcher, window=BATCH_WINDOW, max_size=MAX_BATCH_SIZE):
+        self.matcher = matcher
+        self.window = window
+        self.max_size = max_size
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def assess(self, model_specs):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model_specs, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(),
+                                                    timeout))
+            except asyncio.TimeoutError:
+                break
+        # Take whatever else is already waiting without blocking
+        while len(batch) < self.max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            specs = [model_specs for model_specs, _ in batch]
+            try:
+                results = await asyncio.to_thread(self.matcher.assess_batch,
+                                                  specs)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def _json_safe(value):
+    """Replace nan and infinities, which JSON has no spelling for"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+class AssessmentService:
+    """Routes HTTP requests to a shared ThresholdMatcher"""
+
+    def __init__(self, matcher, window=BATCH_WINDOW):
+        self.matcher = matcher
+        self.batcher = MicroBatcher(matcher, window)
+        self.routes = {
+            ('POST', '/assess'): self.assess,
+            ('POST', '/assess/batch'): self.assess_batch,
+            ('POST', '/compliance'): self.compliance,
+            ('POST', '/gaps'): self.gaps,
+            ('GET', '/tiers/capability'): self.tiers_for_capability,
+            ('GET', '/tiers/evaluation'): self.tiers_requiring_evaluation,
+            ('GET', '/health'): self.health,
+            ('GET', '/metrics'): self.metrics,
+        }
+
+    @staticmethod
+    def _specs(body):
+        try:
+            return ModelSpecs.model_validate(body)
+        except ValidationError as e:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                            json.loads(e.json()))
+
+    def _specs_list(self, body):
+        if not isinstance(body, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            "Expected a JSON list of model specs")
+        return [self._specs(item) for item in body]
+
+    async def assess(self, body):
+        assessment = await self.batcher.assess(self._specs(body))
+        return assessment.model_dump()
+
+    async def assess_batch(self, body):
+        specs = self._specs_list(body)
+        results = await asyncio.to_thread(self.matcher.assess_batch, specs)
+        return [assessment.model_dump() for assessment in results]
+
+    async def compliance(self, body):
+        specs = self._specs(body)
+        crossed = self.matcher.thresholds_crossed(specs.training_compute_flops)
+        regimes = [t for t in crossed if t['kind'] != 'framework']
+        eu_compliant, eu_requirements = self.matcher.eu_compliance(specs)
+        return {
+            'model_name': specs.name,
+            'eu_compliant': eu_compliant,
+            'eu_requirements': eu_requirements,
+            'thresholds_crossed': regimes,
+            'framework_tiers_crossed': len(crossed) - len(regimes),
+        }
+
+    async def gaps(self, body):
+        specs = self._specs_list(body)
+        gaps = await asyncio.to_thread(self.matcher.portfolio_gaps, specs)
+        return _json_safe({
+            'models': len(specs),
+            'trigger_rates': gaps.trigger_rates().to_dict(),
+            'divergent_pairs':
+            gaps.divergent_pairs(top=20).to_dict(orient='records'),
+        })
+
+    @staticmethod
+    def _query(query):
+        value = query.get('q')
+        if not value:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            "Missing query parameter q")
+        return value
+
+    async def tiers_for_capability(self, query):
+        capability = self._query(query)
+        return {'capability': capability,
+                'tiers': self.matcher.tiers_for_capability(capability)}
+
+    async def tiers_requiring_evaluation(self, query):
+        evaluation = self._query(query)
+        return {'evaluation': evaluation,
+                'tiers': self.matcher.tiers_requiring_evaluation(evaluation)}
+
+    async def health(self, body):
+        return {'status': 'ok', 'data_version': self.matcher.data_version,
+                'cache': self.matcher.cache_info()}
+
+    async def metrics(self, body):
+        return self.matcher.export_metrics()
+
+    async def handle(self, method, target, body):
+        """Status and JSON-serializable (or text) response for a request
+
+        POST handlers get the parsed JSON body, GET handlers the query
+        parameters (last value of each).
+        """
+        path, _, query = target.partition('?')
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED,
+                                f"{method} not allowed on {path}")
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint {path}")
+        if method == 'POST':
+            try:
+                body = json.loads(body or b'null')
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid JSON body")
+        else:
+            body = {key: values[-1]
+                    for key, values in parse_qs(query).items()}
+        return HTTPStatus.OK, await handler(body)
+
+    async def serve_connection(self, reader, writer):
+        """Answer HTTP/1.1 requests on one connection until it closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode(
+                        'latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.handle(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': e.message}
+                    keep_alive = keep_alive and e.status < 500 and \
+                        e.status != HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                except ValueError:
+                    status, payload = HTTPStatus.BAD_REQUEST, {
+                        'error': 'Invalid Content-Length'
+                    }
+                    keep_alive = False
+                except Exception as e:
+                    print(f"❌ Error handling {method} {target}: {e}",
+                          file=sys.stderr)
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        'error': 'Internal server error'
+                    }
+
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        content = payload.encode()
+        content_type = 'text/plain; version=0.0.4'
+    else:
+        content = json.dumps(payload).encode()
+        content_type = 'application/json'
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n")
+    return head.encode('latin-1') + content
+
+
+async def serve(host='127.0.0.1', port=8000, root='.', window=BATCH_WINDOW,
+                watch=True):
+    """Run the service until cancelled"""
+    matcher = ThresholdMatcher(root=root, metrics=True)
+    if watch:
+        matcher.start_watching()
+    service = AssessmentService(matcher, window)
+    service.batcher.start()
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"🚀 Serving threshold assessments on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
+        matcher.stop_watching()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--root', default='.',
+                        help='repository root holding data/')
+    parser.add_argument('--batch-window-ms', type=float,
+                        default=BATCH_WINDOW * 1e3,
+                        help='how long /assess waits to share a batch')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.root,
+                          args.batch_window_ms / 1e3))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,6 +2,7 @@ import streamlit as st
 import sys
 import os
 import json
+import html
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
@@ -10,6 +11,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from analysis.threshold_matcher import ThresholdMatcher
+from analysis.text_index import load_text_index
 from analysis.models import ModelSpecs
 
 st.set_page_config(
@@ -277,7 +279,15 @@ st.markdown('<p class="subtitle">Multi-dimensional risk assessment across capabi
 
 @st.cache_resource
 def get_matcher():
-    return ThresholdMatcher()
+    matcher = ThresholdMatcher(metrics=True)
+    # Pick up re-run extractions without restarting the app
+    matcher.start_watching()
+    return matcher
+
+@st.cache_resource
+def get_text_index(data_version):
+    # Keyed on the data version so a hot reload also refreshes search
+    return load_text_index()
 
 try:
     matcher = get_matcher()
@@ -535,6 +545,9 @@ with st.sidebar:
         default=[]
     )
 
+crossed_thresholds = matcher.thresholds_crossed(training_compute)
+eu_systemic_risk = any(t['kind'] == 'eu_ai_act' for t in crossed_thresholds)
+
 tabs = st.tabs(["🎯 Risk Assessment", "🤖 AI Analysis", "📊 Analytics Dashboard", "🗺️ Compliance Mapping", "📜 Audit Trail", "ℹ️ Methodology"])
 
 with tabs[0]:
@@ -587,7 +600,7 @@ with tabs[0]:
         dimensions = {
             "Capability": min(capability_threshold + len([c for c in capabilities if 'CBRN' in c or 'Cyber' in c]) * 15, 100),
             "Autonomy": min(autonomy_threshold + len([c for c in capabilities if 'Autonom' in c]) * 20, 100),
-            "Alignment": min(alignment_threshold + (10 if training_compute >= 1e25 else 0), 100),
+            "Alignment": min(alignment_threshold + (10 if eu_systemic_risk else 0), 100),
             "Societal": min(societal_threshold + len([c for c in capabilities if 'Persuasion' in c]) * 15, 100)
         }
         
@@ -719,6 +732,12 @@ with tabs[1]:
                 ["Gap Analysis", "Compliance Report", "Tier Explanation"],
                 help="Select the type of AI analysis to perform"
             )
+
+            use_cache = st.checkbox(
+                "Reuse cached responses",
+                value=True,
+                help="Answer identical requests from the local response cache instead of calling the model again"
+            )
         
         with ai_col2:
             if action == "Gap Analysis":
@@ -744,7 +763,7 @@ with tabs[1]:
                             }
                         
                         try:
-                            result = analyze_risk_gaps(model_data, framework_data, model=selected_ai_model)
+                            result = analyze_risk_gaps(model_data, framework_data, model=selected_ai_model, use_cache=use_cache)
                             
                             st.markdown(f"""
                             <div class="metric-card">
@@ -794,7 +813,8 @@ with tabs[1]:
                                     "parameters": parameters,
                                     "capabilities": capabilities
                                 },
-                                model=selected_ai_model
+                                model=selected_ai_model,
+                                use_cache=use_cache
                             )
                             
                             st.markdown(report)
@@ -821,7 +841,7 @@ with tabs[1]:
                 if st.button("💡 Explain Tier", type="primary", key="explain_btn"):
                     with st.spinner("Getting explanation..."):
                         try:
-                            explanation = explain_risk_tier(tier_name, framework_name, model=selected_ai_model)
+                            explanation = explain_risk_tier(tier_name, framework_name, model=selected_ai_model, use_cache=use_cache)
                             
                             st.markdown(f"""
                             <div class="metric-card">
@@ -882,38 +902,72 @@ with tabs[2]:
     
     st.markdown("---")
     
-    st.markdown("#### 📈 Risk Trend Analysis")
+    st.markdown("#### 📈 Tier Transitions by Compute")
     
-    trend_data = pd.DataFrame({
-        'Compute Scale': ['10²³', '10²⁴', '10²⁵', '10²⁶', '10²⁷'],
-        'Capability Risk': [15, 30, 55, 78, 95],
-        'Autonomy Risk': [10, 25, 48, 72, 90],
-        'Alignment Risk': [20, 35, 52, 70, 88],
-        'Societal Risk': [12, 28, 50, 75, 92]
-    })
+    sweep = matcher.compute_breakpoints(capabilities)
+    steps = sweep.step_series(1e22, 1e28)
     
-    fig = go.Figure()
-    colors = {'Capability Risk': '#00d4ff', 'Autonomy Risk': '#ff3366', 'Alignment Risk': '#ffcc00', 'Societal Risk': '#00ff88'}
+    fig = px.line(
+        steps,
+        x='flops',
+        y='tier_level',
+        color='source',
+        line_shape='hv',
+        log_x=True,
+        hover_data={'tier': True}
+    )
+    fig.update_traces(line=dict(width=3))
+    fig.add_vline(x=training_compute, line_dash='dash', line_color='#00ff88')
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#e8eaed'},
+        xaxis=dict(title='Training Compute (FLOPs)', tickfont={'color': '#9ca3af'}, gridcolor='#2d3748'),
+        yaxis=dict(title='Tier Level', tickfont={'color': '#9ca3af'}, gridcolor='#2d3748'),
+        legend=dict(font={'color': '#e8eaed'}, title=None),
+        height=350
+    )
+    st.plotly_chart(fig, use_container_width=True)
     
-    for col in ['Capability Risk', 'Autonomy Risk', 'Alignment Risk', 'Societal Risk']:
-        fig.add_trace(go.Scatter(
-            x=trend_data['Compute Scale'],
-            y=trend_data[col],
-            name=col.replace(' Risk', ''),
-            line=dict(color=colors[col], width=3),
-            mode='lines+markers'
-        ))
+    in_range = sweep.breakpoints[(sweep.breakpoints['flops'] >= 1e22) & (sweep.breakpoints['flops'] <= 1e28)]
+    if len(in_range):
+        st.dataframe(
+            in_range.rename(columns={'flops': 'From FLOPs', 'source': 'Framework', 'tier': 'Tier', 'tier_level': 'Level'}),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    st.markdown("#### 🔮 Effective Compute Projection")
     
+    projection = matcher.project_effective_compute(
+        [ModelSpecs(name=model_name, training_compute_flops=training_compute)]
+    )
+    trajectory = projection.trajectory().T.reset_index()
+    trajectory.columns = ['date', 'effective_flops']
+    
+    fig = px.line(trajectory, x='date', y='effective_flops', log_y=True)
+    fig.update_traces(line=dict(width=3, color='#00d4ff'))
+    for threshold in projection.thresholds:
+        fig.add_hline(y=threshold['flops'], line_dash='dot', line_color='#ff8800',
+                      annotation_text=threshold['source'], annotation_font_color='#9ca3af')
     fig.update_layout(
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
         font={'color': '#e8eaed'},
-        xaxis=dict(title='Compute Scale', tickfont={'color': '#9ca3af'}, gridcolor='#2d3748'),
-        yaxis=dict(title='Risk Score', tickfont={'color': '#9ca3af'}, gridcolor='#2d3748'),
-        legend=dict(font={'color': '#e8eaed'}),
+        xaxis=dict(title=None, tickfont={'color': '#9ca3af'}, gridcolor='#2d3748'),
+        yaxis=dict(title='Effective Compute (FLOPs)', tickfont={'color': '#9ca3af'}, gridcolor='#2d3748'),
         height=350
     )
     st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Assumes algorithmic efficiency improves {projection.rate:.0%} per year")
+    
+    crossings = projection.crossings()
+    st.dataframe(
+        crossings[['source', 'threshold_flops', 'crossing_date']].rename(
+            columns={'source': 'Threshold', 'threshold_flops': 'FLOPs', 'crossing_date': 'Crossed On'}),
+        use_container_width=True,
+        hide_index=True
+    )
 
 with tabs[3]:
     st.markdown("### 🗺️ Governance Compliance Mapping")
@@ -921,7 +975,7 @@ with tabs[3]:
     compliance_cols = st.columns(3)
     
     frameworks_compliance = [
-        {"name": "EU AI Act", "status": "non-compliant" if training_compute >= 1e25 else "compliant", "requirements": 12, "met": 8 if training_compute < 1e25 else 4},
+        {"name": "EU AI Act", "status": "non-compliant" if eu_systemic_risk else "compliant", "requirements": 12, "met": 4 if eu_systemic_risk else 8},
         {"name": "Anthropic RSP", "status": "review" if len(capabilities) > 2 else "compliant", "requirements": 8, "met": 6},
         {"name": "OpenAI Preparedness", "status": "review" if training_compute >= 1e25 else "compliant", "requirements": 10, "met": 7},
         {"name": "DeepMind FSF", "status": "compliant" if len(evaluations) > 2 else "review", "requirements": 9, "met": 7},
@@ -958,12 +1012,25 @@ with tabs[3]:
             </div>
             """, unsafe_allow_html=True)
     
+    st.markdown("---")
+    st.markdown("### 📏 Compute Thresholds Crossed")
+    
+    regimes = [t for t in crossed_thresholds if t['kind'] != 'framework']
+    framework_tiers = [t for t in crossed_thresholds if t['kind'] == 'framework']
+    if regimes:
+        for t in regimes:
+            st.markdown(f"❌ **{t['source']}** — {t['flops']:.1e} FLOPs")
+    else:
+        st.markdown("✅ No regulatory compute threshold reached")
+    if framework_tiers:
+        st.caption(f"Also reaches {len(framework_tiers)} framework tier compute thresholds")
+    
     st.markdown("---")
     st.markdown("### 📋 Detailed Requirements")
     
     with st.expander("🇪🇺 EU AI Act Requirements"):
         requirements = [
-            ("Risk Management System", training_compute < 1e25),
+            ("Risk Management System", not eu_systemic_risk),
             ("Data Governance", True),
             ("Technical Documentation", True),
             ("Record Keeping", True),
@@ -977,6 +1044,58 @@ with tabs[3]:
             icon = "✅" if met else "❌"
             color = "#00ff88" if met else "#ff3366"
             st.markdown(f"<span style='color: {color};'>{icon}</span> {req}", unsafe_allow_html=True)
+    
+    st.markdown("---")
+    st.markdown("### 🔎 Threshold Search")
+    
+    search_query = st.text_input(
+        "Search all tiers",
+        placeholder='uplift "autonomous replication" org:anthropic level:>=3 field:safeguards',
+        help='Quote phrases; filter with org:, framework:, level: (e.g. >=3) and field: (capability, evals, safeguards, restrictions, quote)'
+    )
+    
+    if search_query:
+        results = get_text_index(matcher.data_version).search(search_query, limit=20)
+        if results:
+            st.caption(f"{len(results)} matching tiers")
+            for hit in results:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <strong style="color: #e8eaed;">{html.escape(str(hit['organization']))} · {html.escape(str(hit['framework_name']))}</strong>
+                    <span style="color: #9ca3af;"> — {html.escape(str(hit['tier_name']))} (level {hit['tier_level']})</span>
+                    <div style="color: #9ca3af; font-size: 0.9rem; margin-top: 0.5rem;">{html.escape(hit['snippet'])}</div>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("No tiers match this search.")
+    
+    st.markdown("---")
+    st.markdown("### 🧭 What Triggers What")
+    
+    reverse_index = matcher.reverse_index
+    col_cap, col_eval = st.columns(2)
+    
+    with col_cap:
+        family = st.selectbox("Capability family", reverse_index.families())
+        family_tiers = matcher.tiers_for_capability(family) if family else []
+        if family_tiers:
+            st.dataframe(
+                pd.DataFrame(family_tiers).rename(columns={'framework': 'Framework', 'tier': 'Tier', 'tier_level': 'Level', 'compute_threshold_flops': 'Compute (FLOPs)'}),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No tiers mention this capability family.")
+    
+    with col_eval:
+        evaluation = st.selectbox("Evaluation requirement", reverse_index.evaluations())
+        evaluation_tiers = matcher.tiers_requiring_evaluation(evaluation) if evaluation else []
+        if evaluation_tiers:
+            st.dataframe(
+                pd.DataFrame(evaluation_tiers).rename(columns={'framework': 'Framework', 'organization': 'Organization', 'tier': 'Tier', 'tier_level': 'Level', 'compute_threshold_flops': 'Compute (FLOPs)'}),
+                use_container_width=True,
+                hide_index=True
+            )
 
 with tabs[4]:
     st.markdown("### 📜 Audit Trail")
@@ -1005,6 +1124,32 @@ with tabs[4]:
         if st.button("🗑️ Clear Log"):
             st.session_state.audit_log = []
             st.rerun()
+    
+    with st.expander("⏱️ Matcher Performance"):
+        stages = json.loads(matcher.export_metrics('json'))['stages']
+        if stages:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Stage": stage,
+                        "Calls": values['count'],
+                        "Mean (µs)": round(values['mean_seconds'] * 1e6, 1),
+                        "p50 ≤ (µs)": values['p50_seconds'] * 1e6,
+                        "p99 ≤ (µs)": values['p99_seconds'] * 1e6
+                    }
+                    for stage, values in stages.items()
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No assessments timed yet.")
+        st.download_button(
+            "📥 Prometheus Metrics",
+            matcher.export_metrics(),
+            file_name="threshold_matcher.prom",
+            mime="text/plain"
+        )
 
 with tabs[5]:
     st.markdown("### ℹ️ Methodology & Data Sources")
@@ -0,0 +1,174 @@
+"""Time ThresholdMatcher on synthetic corpora of increasing size
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 100x10 1000x100 --compare benchmarks/results/abc1234.json
+
+Results are written as JSON (one record per benchmark and corpus size) to
+benchmarks/results/<commit>.json unless --output is given.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from analysis.models import ModelSpecs
+from analysis.text_index import TextIndex
+from analysis.threshold_matcher import ThresholdMatcher
+from benchmarks.synthetic import generate_models, write_corpus
+
+DEFAULT_SIZES = ['10x10', '100x10', '100x100', '1000x10', '1000x100']
+RESULTS_DIR = 'benchmarks/results'
+
+
+def _time(fn, repeat):
+    """Best and median wall time of fn over repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_size(n_frameworks, tiers_per_framework, n_models, repeat):
+    """Benchmark records for one corpus size"""
+    specs = [ModelSpecs(**model) for model in generate_models(n_models)]
+    records = []
+
+    def record(name, fn, items=1):
+        best, median = _time(fn, repeat)
+        records.append({
+            'benchmark': name,
+            'frameworks': n_frameworks,
+            'tiers_per_framework': tiers_per_framework,
+            'items': items,
+            'seconds_best': best,
+            'seconds_median': median,
+            'us_per_item': best / items * 1e6,
+        })
+        per_item = f"  ({best / items * 1e6:.1f} µs/model)" if items > 1 else ""
+        print(f"  {name:<24} {best * 1e3:>10.2f} ms{per_item}")
+
+    with tempfile.TemporaryDirectory() as root:
+        write_corpus(root, n_frameworks, tiers_per_framework)
+
+        record('load_json',
+               lambda: ThresholdMatcher(root=root, use_snapshot=False))
+        matcher = ThresholdMatcher(root=root, use_snapshot=False)
+        record('build_snapshot', matcher.build_snapshot)
+        record('load_snapshot', lambda: ThresholdMatcher(root=root))
+
+        def assess_all(use_cache):
+            for spec in specs:
+                matcher.assess_model(spec, use_cache=use_cache)
+
+        record('assess_model', lambda: assess_all(False), n_models)
+        matcher.metrics.enabled = True
+        record('assess_model_metrics', lambda: assess_all(False), n_models)
+        matcher.metrics.enabled = False
+        assess_all(True)
+        record('assess_model_cached', lambda: assess_all(True), n_models)
+        record('assess_many', lambda: matcher.assess_many(specs), n_models)
+        record('assess_many_sharded',
+               lambda: matcher.assess_many(specs, workers=0), n_models)
+        record('portfolio_gaps', lambda: matcher.portfolio_gaps(specs),
+               n_models)
+        record('effective_compute',
+               lambda: matcher.project_effective_compute(specs), n_models)
+        record('compute_breakpoints',
+               lambda: matcher.compute_breakpoints(['Cyber offense']))
+
+        index = TextIndex.build(matcher.frameworks)
+        record('text_search',
+               lambda: index.search('"model weights" level:>=2 uplift'))
+    return records
+
+
+def compare(records, baseline_path):
+    """Print the speed ratio of each record against a previous results file"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    previous = {(r['benchmark'], r['frameworks'], r['tiers_per_framework']): r
+                for r in baseline['results']}
+
+    print(f"\n📊 Compared with {baseline.get('commit', baseline_path)}"
+          " (ratio > 1 means slower now)")
+    for r in records:
+        old = previous.get(
+            (r['benchmark'], r['frameworks'], r['tiers_per_framework']))
+        if old is None or not old['us_per_item']:
+            continue
+        ratio = r['us_per_item'] / old['us_per_item']
+        flag = '⚠️ ' if ratio > 1.2 else '  '
+        print(f"{flag}{r['benchmark']:<24} {r['frameworks']:>5}x"
+              f"{r['tiers_per_framework']:<4} {ratio:6.2f}x")
+
+
+def parse_size(size):
+    frameworks, tiers = size.lower().split('x')
+    return int(frameworks), int(tiers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='corpus sizes as FRAMEWORKSxTIERS')
+    parser.add_argument('--models', type=int, default=1000,
+                        help='models assessed per size')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark (best is reported)')
+    parser.add_argument('--output', help='results file to write')
+    parser.add_argument('--compare', help='earlier results file to compare')
+    args = parser.parse_args(argv)
+
+    records = []
+    for size in args.sizes:
+        n_frameworks, tiers = parse_size(size)
+        print(f"\n⏱️ {n_frameworks} frameworks x {tiers} tiers, "
+              f"{args.models} models")
+        records.extend(run_size(n_frameworks, tiers, args.models,
+                                args.repeat))
+
+    commit = _commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'models': args.models,
+        'repeat': args.repeat,
+        'results': records,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📁 Results saved to: {output}")
+
+    if args.compare:
+        compare(records, args.compare)
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,104 @@
+import json
+import os
+import random
+
+from analysis.capability_matcher import DEFAULT_TAXONOMY
+
+# Phrases are drawn from small shared vocabularies, as in extracted
+# frameworks where the same evaluation and safeguard sentences recur
+FAMILY_PHRASES = {
+    "cbrn": "meaningful uplift to actors developing CBRN weapons",
+    "cyber": "autonomously discovering and exploiting cyber vulnerabilities",
+    "autonomy": "autonomous replication and adaptation in the wild",
+    "persuasion": "persuasion at a scale that shifts public opinion",
+}
+EVALUATIONS = [
+    f"Evaluation suite {i}: model scores below the expert baseline"
+    for i in range(40)
+]
+SAFEGUARDS = [f"Safeguard {i}: restrict access to model weights" for i in range(25)]
+RESTRICTIONS = [f"Deployment restriction {i}" for i in range(10)]
+
+
+def generate_frameworks(n_frameworks, tiers_per_framework, seed=0,
+                        compute_share=0.5):
+    """Synthetic frameworks shaped like data/processed/frameworks.json
+
+    Each framework gets tiers_per_framework tiers with levels 1..n (some
+    shared), capability text mentioning one taxonomy family, and a compute
+    threshold on roughly compute_share of tiers. Framework names repeat
+    every 50 frameworks to mimic multiple versions of one framework.
+    """
+    rng = random.Random(seed)
+    families = list(FAMILY_PHRASES)
+    frameworks = []
+    for f in range(n_frameworks):
+        tiers = []
+        for t in range(tiers_per_framework):
+            family = rng.choice(families)
+            tier = {
+                "tier_name": f"Level {t + 1}",
+                "tier_level": rng.randint(max(1, t - 1), t + 1),
+                "capability_threshold":
+                f"Model shows {FAMILY_PHRASES[family]} (threshold {t})",
+                "compute_threshold_flops": None,
+                "evaluation_requirements": rng.sample(EVALUATIONS, 3),
+                "required_safeguards": rng.sample(SAFEGUARDS, 2),
+                "deployment_restrictions": rng.sample(RESTRICTIONS, 1),
+                "source_quote": f"Tier {t} of framework {f}",
+            }
+            if rng.random() < compute_share:
+                tier["compute_threshold_flops"] = 10**rng.uniform(23, 27)
+            tiers.append(tier)
+        frameworks.append({
+            "organization": f"Lab {f % 50}",
+            "framework_name": f"Synthetic Framework {f % 50}",
+            "version": f"v{f // 50}",
+            "risk_tiers": tiers,
+        })
+    return frameworks
+
+
+def generate_models(n_models, seed=0):
+    """Synthetic model specs spanning 1e22 to 1e28 training FLOPs"""
+    rng = random.Random(seed)
+    capabilities = [
+        "CBRN acceleration", "Cyber offense", "Autonomous replication",
+        "Advanced persuasion", "Code generation"
+    ]
+    return [{
+        "name": f"model-{i}",
+        "training_compute_flops": 10**rng.uniform(22, 28),
+        "capabilities": rng.sample(capabilities, rng.randint(0, 2)),
+    } for i in range(n_models)]
+
+
+def write_corpus(root, n_frameworks, tiers_per_framework, seed=0):
+    """Write a synthetic data/processed tree under root for ThresholdMatcher"""
+    processed = os.path.join(root, 'data', 'processed')
+    os.makedirs(processed, exist_ok=True)
+
+    documents = {
+        'frameworks.json': {
+            'frameworks':
+            generate_frameworks(n_frameworks, tiers_per_framework, seed)
+        },
+        'eu_compliance.json': {
+            'eu_ai_act': {
+                'compute_threshold_flops': 1e25,
+                'required_evaluations': ["Model evaluation", "Adversarial testing"]
+            }
+        },
+        'compute_thresholds.json': {
+            'compute_thresholds': [{
+                'threshold_flops': 1e25,
+                'source': 'EU AI Act'
+            }]
+        },
+    }
+    for filename, document in documents.items():
+        with open(os.path.join(processed, filename), 'w') as f:
+            json.dump(document, f)
+    with open(os.path.join(root, 'data', 'capability_taxonomy.json'), 'w') as f:
+        json.dump(DEFAULT_TAXONOMY, f)
+    return root
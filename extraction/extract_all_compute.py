@@ -2,14 +2,25 @@ import sys
 
 sys.path.append('..')
 
-from utils.openai_client import AIExtractor
-from utils.pdf_reader import get_all_documents, read_document
+from analysis.snapshot import rebuild_snapshot
+from analysis.version_store import record_version
+from utils.extraction_manifest import ExtractionManifest, fingerprint
+from utils.openai_client import DEFAULT_MODEL, AIExtractor
+from utils.pdf_reader import read_document
 import json
 import os
 
+OUTPUT = 'compute_thresholds.json'
+OUTPUT_PATH = f'../data/processed/{OUTPUT}'
+PROMPT_PATH = 'prompts/compute_thresholds.txt'
 
-def extract_compute_from_pdfs():
-    """Extract compute threshold data from downloaded documents"""
+
+def extract_compute_from_pdfs(force=False):
+    """Extract compute threshold data from downloaded documents
+
+    A document whose content, prompt and model are unchanged since it was
+    last extracted (per the extraction manifest) is not sent again.
+    """
 
     extractor = AIExtractor()
 
@@ -22,7 +33,7 @@ def extract_compute_from_pdfs():
     raw_dir = '../data/raw'
 
     if os.path.exists(raw_dir):
-        for filename in os.listdir(raw_dir):
+        for filename in sorted(os.listdir(raw_dir)):
             if 'compute' in filename.lower() or 'threshold' in filename.lower(
             ):
                 compute_files.append(os.path.join(raw_dir, filename))
@@ -31,40 +42,56 @@ def extract_compute_from_pdfs():
         print("⚠️ No compute threshold documents found")
         return None
 
-    for filepath in compute_files:
-        print(f"\n📄 Reading {os.path.basename(filepath)}...")
-        content = read_document(filepath)
+    manifest = ExtractionManifest('..')
+    manifest.prune(OUTPUT, [os.path.basename(path) for path in compute_files])
 
-        if not content:
-            continue
+    for filepath in compute_files:
+        filename = os.path.basename(filepath)
+        document_fingerprint = fingerprint(filepath, PROMPT_PATH,
+                                           DEFAULT_MODEL)
+        if not force and manifest.is_current(OUTPUT, filename,
+                                             document_fingerprint):
+            result = manifest.result(OUTPUT, filename)
+            if os.path.exists(OUTPUT_PATH):
+                print(
+                    f"✅ Compute threshold data up to date ({filename} unchanged)")
+                manifest.save()
+                return result
+        else:
+            print(f"\n📄 Reading {filename}...")
+            content = read_document(filepath)
 
-        if len(content) > 100000:
-            content = content[:100000]
+            if not content:
+                continue
 
-        print(f"📊 Extracting compute data ({len(content)} chars)...")
+            print(f"📊 Extracting compute data ({len(content)} chars)...")
 
-        with open('prompts/compute_thresholds.txt', 'r') as f:
-            compute_prompt = f.read()
+            with open(PROMPT_PATH, 'r') as f:
+                compute_prompt = f.read()
 
-        try:
-            result = extractor.extract_structured(content, compute_prompt)
+            try:
+                result = extractor.extract_chunked(content, compute_prompt)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                continue
 
-            if result:
-                os.makedirs('../data/processed', exist_ok=True)
-                with open('../data/processed/compute_thresholds.json',
-                          'w') as f:
-                    json.dump(result, f, indent=2)
+            if not result:
+                continue
+            manifest.record(OUTPUT, filename, document_fingerprint, result)
 
-                print("✅ Compute threshold data extracted!")
-                print(f"📁 Saved to: data/processed/compute_thresholds.json")
-                return result
+        os.makedirs('../data/processed', exist_ok=True)
+        with open(OUTPUT_PATH, 'w') as f:
+            json.dump(result, f, indent=2)
+        manifest.save()
 
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            continue
+        print("✅ Compute threshold data extracted!")
+        print(f"📁 Saved to: data/processed/compute_thresholds.json")
+        rebuild_snapshot('..')
+        record_version('..')
+        return result
 
     return None
 
 
 if __name__ == "__main__":
-    extract_compute_from_pdfs()
+    extract_compute_from_pdfs(force='--force' in sys.argv)
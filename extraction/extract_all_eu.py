@@ -2,14 +2,25 @@ import sys
 
 sys.path.append('..')
 
-from utils.openai_client import AIExtractor
-from utils.pdf_reader import get_all_documents
+from analysis.snapshot import rebuild_snapshot
+from analysis.version_store import record_version
+from utils.extraction_manifest import ExtractionManifest, fingerprint
+from utils.openai_client import DEFAULT_MODEL, AIExtractor
+from utils.pdf_reader import read_document
 import json
 import os
 
+OUTPUT = 'eu_compliance.json'
+OUTPUT_PATH = f'../data/processed/{OUTPUT}'
+PROMPT_PATH = 'prompts/eu_compliance.txt'
 
-def extract_eu_from_pdfs():
-    """Extract EU compliance data from downloaded documents"""
+
+def extract_eu_from_pdfs(force=False):
+    """Extract EU compliance data from downloaded documents
+
+    A document whose content, prompt and model are unchanged since it was
+    last extracted (per the extraction manifest) is not sent again.
+    """
 
     extractor = AIExtractor()
 
@@ -24,7 +35,7 @@ def extract_eu_from_pdfs():
     # Check for EU-related files
     raw_dir = '../data/raw'
     if os.path.exists(raw_dir):
-        for filename in os.listdir(raw_dir):
+        for filename in sorted(os.listdir(raw_dir)):
             if 'eu' in filename.lower():
                 eu_files.append(os.path.join(raw_dir, filename))
 
@@ -32,43 +43,56 @@ def extract_eu_from_pdfs():
         print("⚠️ No EU documents found, using default data")
         return None
 
-    # Read first EU document
-    from utils.pdf_reader import read_document
+    manifest = ExtractionManifest('..')
+    manifest.prune(OUTPUT, [os.path.basename(path) for path in eu_files])
 
     for filepath in eu_files:
-        print(f"\n📄 Reading {os.path.basename(filepath)}...")
-        content = read_document(filepath)
-
-        if not content:
-            continue
+        filename = os.path.basename(filepath)
+        document_fingerprint = fingerprint(filepath, PROMPT_PATH,
+                                           DEFAULT_MODEL)
+        if not force and manifest.is_current(OUTPUT, filename,
+                                             document_fingerprint):
+            result = manifest.result(OUTPUT, filename)
+            if os.path.exists(OUTPUT_PATH):
+                print(
+                    f"✅ EU compliance data up to date ({filename} unchanged)")
+                manifest.save()
+                return result
+        else:
+            print(f"\n📄 Reading {filename}...")
+            content = read_document(filepath)
 
-        # Truncate if needed
-        if len(content) > 100000:
-            content = content[:100000]
+            if not content:
+                continue
 
-        print(f"📊 Extracting EU compliance data ({len(content)} chars)...")
+            print(f"📊 Extracting EU compliance data ({len(content)} chars)...")
 
-        with open('prompts/eu_compliance.txt', 'r') as f:
-            eu_prompt = f.read()
+            with open(PROMPT_PATH, 'r') as f:
+                eu_prompt = f.read()
 
-        try:
-            result = extractor.extract_structured(content, eu_prompt)
+            try:
+                result = extractor.extract_chunked(content, eu_prompt)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                continue
 
-            if result:
-                os.makedirs('../data/processed', exist_ok=True)
-                with open('../data/processed/eu_compliance.json', 'w') as f:
-                    json.dump(result, f, indent=2)
+            if not result:
+                continue
+            manifest.record(OUTPUT, filename, document_fingerprint, result)
 
-                print("✅ EU compliance data extracted!")
-                print(f"📁 Saved to: data/processed/eu_compliance.json")
-                return result
+        os.makedirs('../data/processed', exist_ok=True)
+        with open(OUTPUT_PATH, 'w') as f:
+            json.dump(result, f, indent=2)
+        manifest.save()
 
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            continue
+        print("✅ EU compliance data extracted!")
+        print(f"📁 Saved to: data/processed/eu_compliance.json")
+        rebuild_snapshot('..')
+        record_version('..')
+        return result
 
     return None
 
 
 if __name__ == "__main__":
-    extract_eu_from_pdfs()
+    extract_eu_from_pdfs(force='--force' in sys.argv)
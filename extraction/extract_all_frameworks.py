@@ -2,11 +2,23 @@ import sys
 
 sys.path.append('..')
 
-from utils.openai_client import AIExtractor
-from utils.pdf_reader import get_all_documents
+from analysis.snapshot import rebuild_snapshot
+from analysis.text_index import rebuild_text_index
+from analysis.version_store import record_version
+from utils.extraction_manifest import ExtractionManifest, fingerprint
+from utils.openai_client import DEFAULT_MODEL, AIExtractor
+from utils.pdf_reader import list_documents, read_document
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
 
+# Documents extracted at once; the shared rate limiter paces the requests
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', 4))
+
+OUTPUT = 'frameworks.json'
+OUTPUT_PATH = f'../data/processed/{OUTPUT}'
+PROMPT_PATH = 'prompts/framework_extraction.txt'
+
 
 def load_prompt(filename):
     """Load extraction prompt from file"""
@@ -14,8 +26,13 @@ def load_prompt(filename):
         return f.read()
 
 
-def extract_from_all_pdfs():
-    """Extract framework data from all downloaded PDFs"""
+def extract_from_all_pdfs(force=False):
+    """Extract framework data from all downloaded PDFs
+
+    Only documents whose content, prompt or model changed since the last
+    run (per the extraction manifest) are re-extracted; the rest reuse
+    their recorded frameworks. force re-extracts everything.
+    """
 
     extractor = AIExtractor()
 
@@ -23,58 +40,79 @@ def extract_from_all_pdfs():
     print("EXTRACTING ALL FRAMEWORK DOCUMENTS")
     print("=" * 60)
 
-    # Read all documents from METR folder
-    print("\n📚 Loading METR framework documents...")
-    metr_docs = get_all_documents('../data/raw/metr')
+    docs_dir = '../data/raw/metr'
+    filenames = list_documents(docs_dir)
 
-    if not metr_docs:
+    if not filenames:
         print("⚠️ No documents found in data/raw/metr/")
         return None
 
-    print(f"\n✅ Loaded {len(metr_docs)} documents")
-
-    # Combine all documents (or process individually)
-    all_frameworks = []
+    manifest = ExtractionManifest('..')
+    removed = manifest.prune(OUTPUT, filenames)
+    fingerprints = {
+        filename: fingerprint(os.path.join(docs_dir, filename),
+                              PROMPT_PATH, DEFAULT_MODEL)
+        for filename in filenames
+    }
+    changed = [
+        filename for filename in filenames if force
+        or not manifest.is_current(OUTPUT, filename, fingerprints[filename])
+    ]
+
+    print(f"\n📚 {len(filenames)} METR framework documents, "
+          f"{len(changed)} new or changed")
+    if not changed and not removed and os.path.exists(OUTPUT_PATH):
+        print("✅ Extracted frameworks are up to date")
+        with open(OUTPUT_PATH, 'r') as f:
+            return json.load(f)
 
     framework_prompt = load_prompt('framework_extraction.txt')
 
-    for filename, content in metr_docs.items():
-        print(f"\n{'='*60}")
-        print(f"Processing: {filename}")
-        print(f"{'='*60}")
-
-        # Truncate if too long (GPT-4o context limit)
-        max_chars = 100000
-        if len(content) > max_chars:
-            print(
-                f"⚠️ Document too long ({len(content)} chars), truncating to {max_chars}"
-            )
-            content = content[:max_chars]
+    def extract(filename):
+        print(f"📄 Reading {filename}...")
+        content = read_document(os.path.join(docs_dir, filename))
+        if not content:
+            return None
 
         print(f"📊 Extracting from {filename} ({len(content)} chars)...")
 
         try:
-            result = extractor.extract_structured(content, framework_prompt)
-
-            if result and 'frameworks' in result:
-                frameworks = result['frameworks']
-                all_frameworks.extend(frameworks)
-                print(
-                    f"✅ Extracted {len(frameworks)} framework(s) from {filename}"
-                )
-            else:
-                print(f"⚠️ No frameworks extracted from {filename}")
-
+            # Long documents are extracted section by section
+            result = extractor.extract_chunked(content, framework_prompt)
         except Exception as e:
             print(f"❌ Error processing {filename}: {e}")
-            continue
+            return None
+
+        if result and 'frameworks' in result:
+            frameworks = result['frameworks']
+            print(
+                f"✅ Extracted {len(frameworks)} framework(s) from {filename}")
+            return frameworks
+        print(f"⚠️ No frameworks extracted from {filename}")
+        return None
+
+    # Documents run concurrently; failed ones are left out of the manifest
+    # so the next run retries them, and keep their previous frameworks
+    with ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS) as executor:
+        for filename, frameworks in zip(changed,
+                                        executor.map(extract, changed)):
+            if frameworks is not None:
+                manifest.record(OUTPUT, filename, fingerprints[filename],
+                                frameworks)
+    manifest.save()
+
+    # Combine in filename order, so the output does not depend on which
+    # call finished first
+    all_frameworks = []
+    for filename in filenames:
+        all_frameworks.extend(manifest.result(OUTPUT, filename) or [])
 
     # Save combined results
     if all_frameworks:
         final_result = {'frameworks': all_frameworks}
 
         os.makedirs('../data/processed', exist_ok=True)
-        with open('../data/processed/frameworks.json', 'w') as f:
+        with open(OUTPUT_PATH, 'w') as f:
             json.dump(final_result, f, indent=2)
 
         print("\n" + "=" * 60)
@@ -82,6 +120,9 @@ def extract_from_all_pdfs():
         print("=" * 60)
         print(f"✅ Total frameworks extracted: {len(all_frameworks)}")
         print(f"📁 Saved to: data/processed/frameworks.json")
+        rebuild_snapshot('..')
+        rebuild_text_index('..')
+        record_version('..')
 
         # Show summary
         print("\n📊 Framework Summary:")
@@ -98,4 +139,4 @@ def extract_from_all_pdfs():
 
 
 if __name__ == "__main__":
-    extract_from_all_pdfs()
+    extract_from_all_pdfs(force='--force' in sys.argv)
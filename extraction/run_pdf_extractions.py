@@ -1,9 +1,10 @@
 from extract_all_frameworks import extract_from_all_pdfs
 from extract_all_eu import extract_eu_from_pdfs
 from extract_all_compute import extract_compute_from_pdfs
-import time
+import sys
 
-def main():
+def main(force=False):
+    """Run every extraction; force re-extracts unchanged documents too"""
     print("\n" + "=" * 60)
     print("FRONTIER AI RISK ANALYZER - PDF EXTRACTION")
     print("=" * 60)
@@ -17,21 +18,19 @@ def main():
     print("\n\n" + "🏢" * 30)
     print("STEP 1: EXTRACTING FRAMEWORKS FROM ALL PDFS")
     print("🏢" * 30)
-    frameworks = extract_from_all_pdfs()
-    time.sleep(2)
+    frameworks = extract_from_all_pdfs(force)
 
     # Extract EU
     print("\n\n" + "🇪🇺" * 30)
     print("STEP 2: EXTRACTING EU COMPLIANCE DATA")
     print("🇪🇺" * 30)
-    eu = extract_eu_from_pdfs()
-    time.sleep(2)
+    eu = extract_eu_from_pdfs(force)
 
     # Extract compute
     print("\n\n" + "💻" * 30)
     print("STEP 3: EXTRACTING COMPUTE THRESHOLDS")
     print("💻" * 30)
-    compute = extract_compute_from_pdfs()
+    compute = extract_compute_from_pdfs(force)
 
     # Summary
     print("\n\n" + "=" * 60)
@@ -60,4 +59,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(force='--force' in sys.argv)
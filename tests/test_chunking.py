@@ -0,0 +1,23 @@
+import pytest
+
+from utils.chunking import split_sections
+
+
+def test_chunks_cover_the_text_within_the_size_limit():
+    text = ''.join(f"SECTION {i}\n" + "Some policy text.\n" * 40
+                   for i in range(20))
+    chunks = split_sections(text, max_chars=1000, overlap=100)
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert chunks[0].startswith('SECTION 0')
+    assert text.endswith(chunks[-1])
+    position = 0
+    for chunk in chunks:
+        start = text.index(chunk, max(position - 1000, 0))
+        assert start <= position
+        position = start + len(chunk)
+    assert position == len(text)
+
+
+def test_overlap_must_be_smaller_than_chunks():
+    with pytest.raises(ValueError):
+        split_sections('x' * 5000, max_chars=1000, overlap=1000)
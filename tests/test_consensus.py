@@ -0,0 +1,67 @@
+import copy
+
+from utils.consensus import combine_partial_extractions, merge_extractions
+
+
+def _multi_level_framework():
+    return {
+        'frameworks': [{
+            'organization': 'Microsoft',
+            'framework_name': 'Frontier Governance Framework',
+            'risk_tiers': [{
+                'tier_name': name,
+                'tier_level': level,
+                'required_safeguards': [f'{name} safeguards {level}'],
+            } for name in ('CBRN weapons', 'Offensive cyberoperations',
+                           'Advanced autonomy') for level in range(1, 5)],
+        }]
+    }
+
+
+def test_merge_keeps_same_named_tiers_at_each_level():
+    passes = [_multi_level_framework() for _ in range(3)]
+    merged = merge_extractions(passes)
+    tiers = merged['frameworks'][0]['risk_tiers']
+    assert tiers == _multi_level_framework()['frameworks'][0]['risk_tiers']
+
+
+def test_merge_drops_tier_levels_found_by_one_pass():
+    passes = [_multi_level_framework() for _ in range(3)]
+    extra = copy.deepcopy(passes[0]['frameworks'][0]['risk_tiers'][0])
+    extra['tier_level'] = 5
+    passes[0]['frameworks'][0]['risk_tiers'].append(extra)
+    tiers = merge_extractions(passes)['frameworks'][0]['risk_tiers']
+    assert len(tiers) == 12
+    assert max(tier['tier_level'] for tier in tiers) == 4
+
+
+def test_unnamed_tiers_match_by_level():
+    passes = [{'risk_tiers': [{'tier_level': 1}, {'tier_level': 2}]},
+              {'risk_tiers': [{'tier_level': 2.0}]}]
+    assert merge_extractions(passes) == {'risk_tiers': [{'tier_level': 2}]}
+
+
+def test_combine_keeps_same_named_tiers_at_each_level():
+    chunks = [_multi_level_framework() for _ in range(2)]
+    combined = combine_partial_extractions(chunks)
+    assert combined == _multi_level_framework()
+
+
+def test_combine_keeps_regimes_sharing_a_threshold_apart():
+    chunks = [{
+        'compute_thresholds': [{'threshold_flops': 1e26,
+                                'source': 'EO 14110',
+                                'triggers': ['Reporting to Commerce']}]
+    }, {
+        'compute_thresholds': [{'threshold_flops': 10**26,
+                                'source': 'CA SB 53',
+                                'triggers': ['Safety framework']},
+                               {'threshold_flops': 1e26,
+                                'source': 'eo 14110',
+                                'triggers': ['Red-team results']}]
+    }]
+    thresholds = combine_partial_extractions(chunks)['compute_thresholds']
+    assert [(t['source'], t['triggers']) for t in thresholds] == [
+        ('EO 14110', ['Reporting to Commerce', 'Red-team results']),
+        ('CA SB 53', ['Safety framework']),
+    ]
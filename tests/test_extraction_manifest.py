@@ -0,0 +1,39 @@
+from utils.extraction_manifest import ExtractionManifest, fingerprint
+
+OUTPUT = 'frameworks.json'
+
+
+def _inputs(tmp_path):
+    document = tmp_path / 'policy.pdf'
+    prompt = tmp_path / 'prompt.txt'
+    document.write_bytes(b'%PDF framework text')
+    prompt.write_text('Extract the frameworks')
+    return document, prompt
+
+
+def test_unchanged_inputs_are_skipped(tmp_path):
+    document, prompt = _inputs(tmp_path)
+    manifest = ExtractionManifest(str(tmp_path))
+    manifest.record(OUTPUT, 'policy.pdf',
+                    fingerprint(document, prompt, 'model-a'),
+                    {'frameworks': []})
+    manifest.save()
+
+    reloaded = ExtractionManifest(str(tmp_path))
+    assert reloaded.is_current(OUTPUT, 'policy.pdf',
+                               fingerprint(document, prompt, 'model-a'))
+    assert reloaded.result(OUTPUT, 'policy.pdf') == {'frameworks': []}
+
+
+def test_changed_prompt_or_model_is_reextracted(tmp_path):
+    document, prompt = _inputs(tmp_path)
+    manifest = ExtractionManifest(str(tmp_path))
+    manifest.record(OUTPUT, 'policy.pdf',
+                    fingerprint(document, prompt, 'model-a'),
+                    {'frameworks': []})
+
+    assert not manifest.is_current(OUTPUT, 'policy.pdf',
+                                   fingerprint(document, prompt, 'model-b'))
+    prompt.write_text('Extract the frameworks and their tiers')
+    assert not manifest.is_current(OUTPUT, 'policy.pdf',
+                                   fingerprint(document, prompt, 'model-a'))
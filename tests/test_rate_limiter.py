@@ -0,0 +1,34 @@
+import pytest
+
+from utils.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_at_its_rate_up_to_capacity():
+    bucket = TokenBucket(capacity=10, rate=2)
+    start = bucket.updated
+    bucket.level = 0
+    assert bucket.wait_time(4, start) == 2.0
+    assert bucket.wait_time(4, start + 1) == 1.0
+    assert bucket.wait_time(4, start + 2) == 0.0
+    bucket.wait_time(0, start + 100)
+    assert bucket.level == 10
+    # More than the capacity waits only for a full bucket
+    bucket.level = 0
+    assert bucket.wait_time(50, start + 100) == 5.0
+
+
+def test_record_usage_settles_the_estimate():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+    limiter.acquire(100)
+    assert limiter.tokens.level == pytest.approx(500, abs=1)
+    limiter.record_usage(estimated=100, actual=250)
+    assert limiter.tokens.level == pytest.approx(350, abs=1)
+    limiter.record_usage(estimated=250, actual=50)
+    assert limiter.tokens.level == pytest.approx(550, abs=1)
+    assert limiter.waited == 0.0
+
+
+@pytest.mark.parametrize('limits', [(0, 600), (60, 0), (-1, 600), (60, -5)])
+def test_non_positive_limits_are_rejected(limits):
+    with pytest.raises(ValueError, match='must be positive'):
+        RateLimiter(*limits)
@@ -0,0 +1,22 @@
+import json
+
+from utils.response_cache import ResponseCache, cached_completion
+
+
+def test_responses_failing_validation_are_not_replayed(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'))
+    responses = iter(['not json', '{"frameworks": []}'])
+    calls = []
+
+    def create(**request):
+        calls.append(request)
+        return next(responses)
+
+    results = [
+        cached_completion(create, cache, True, json.loads, model='m',
+                          messages=[{'role': 'user', 'content': 'doc'}])
+        for _ in range(3)
+    ]
+    assert results == ['not json', '{"frameworks": []}', '{"frameworks": []}']
+    assert len(calls) == 2
+    assert cache.info()['entries'] == 1
@@ -0,0 +1,42 @@
+import json
+import math
+
+from analysis.models import ModelSpecs
+from analysis.threshold_matcher import FRAMEWORKS_PATH, ThresholdMatcher
+
+FRAMEWORK = {
+    'framework_name': 'Test Framework',
+    'risk_tiers': [
+        {'tier_name': 'Tier 1', 'tier_level': 1,
+         'compute_threshold_flops': 1e24},
+        {'tier_name': 'Tier 2', 'tier_level': 2,
+         'compute_threshold_flops': 1e26},
+    ],
+}
+
+
+def _matcher(root):
+    path = root / FRAMEWORKS_PATH
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({'frameworks': [FRAMEWORK]}))
+    return ThresholdMatcher(root=str(root), use_snapshot=False)
+
+
+def test_eu_flag_agrees_across_assessment_paths(tmp_path):
+    matcher = _matcher(tmp_path)
+    eu_threshold = matcher._data.compute_index.eu_threshold
+    computes = [math.nan, math.inf, -math.inf, 0.0, 1e24,
+                math.nextafter(eu_threshold, 0), eu_threshold, 1e26]
+    specs = [
+        ModelSpecs(name=f'model {i}', training_compute_flops=compute,
+                   capabilities=['Cyber offense'])
+        for i, compute in enumerate(computes)
+    ]
+
+    single = [matcher.assess_model(spec).eu_compliant for spec in specs]
+    assert single == [True, False, True, True, True, True, False, False]
+    assert matcher.assess_many(specs)['eu_compliant'].tolist() == single
+    assert matcher.assess_many(
+        specs, workers=2)['eu_compliant'].tolist() == single
+    assert [a.eu_compliant
+            for a in matcher.assess_batch(specs, use_cache=False)] == single
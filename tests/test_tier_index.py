@@ -0,0 +1,32 @@
+import math
+
+import numpy as np
+
+from analysis.tier_index import CompiledFramework, TierIndex
+
+FRAMEWORK = {
+    'framework_name': 'Test Framework',
+    'risk_tiers': [
+        {'tier_name': 'Tier 1', 'tier_level': 1,
+         'compute_threshold_flops': 1e24},
+        {'tier_name': 'Tier 2', 'tier_level': 2,
+         'compute_threshold_flops': 1e26},
+    ],
+}
+
+
+def test_nan_compute_reaches_no_threshold():
+    framework = CompiledFramework(FRAMEWORK)
+    assert framework.compute_position(math.nan) == len(framework)
+    assert framework.match(math.nan, len(framework)) == 'Below threshold'
+
+
+def test_batch_positions_agree_with_single_model_positions():
+    index = TierIndex([FRAMEWORK])
+    computes = np.array([math.nan, math.inf, -math.inf, 1e24, 1e25, 1e26])
+    capability_positions = np.full((len(computes), 1), len(index.frameworks[0]))
+    positions = index.batch_positions(computes, capability_positions)
+    assert positions[:, 0].tolist() == [
+        index.frameworks[0].compute_position(c) for c in computes
+    ]
+    assert positions[:, 0].tolist() == [2, 0, 2, 1, 1, 0]
@@ -0,0 +1,65 @@
+import re
+
+# Sized so each call stays well inside the context window and returns
+# quickly; the overlap keeps a tier described across a boundary whole in
+# at least one chunk
+CHUNK_CHARS = 24000
+CHUNK_OVERLAP = 1500
+
+# Lines that start a section: markdown headings, numbered or lettered
+# headings ("3.2 Evaluations", "II. Compute", "A. What Is"), Article /
+# Section / Annex labels and short all-caps titles
+SECTION_HEADING = re.compile(
+    r'^(?:#{1,6}\s'
+    r'|(?:\d+(?:\.\d+)*|[IVXLC]+|[A-H])[.)]?\s+[A-Z]'
+    r'|(?:Article|ARTICLE|Section|SECTION|Chapter|CHAPTER|Annex|ANNEX'
+    r'|Appendix|APPENDIX|Part|PART)\s'
+    r'|[A-Z][A-Z0-9 ,:;&/\-]{3,80}$)', re.MULTILINE)
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+
+
+def _last_boundary(positions, low, high):
+    candidates = [position for position in positions if low < position <= high]
+    return candidates[-1] if candidates else None
+
+
+def split_sections(text, max_chars=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Split text into chunks of at most max_chars, on section boundaries
+
+    Each chunk ends at the last section heading that leaves it at least
+    half full, else at the last paragraph break, else the last line break,
+    else max_chars. Consecutive chunks share about overlap characters,
+    starting at a line boundary.
+    """
+    if overlap >= max_chars:
+        raise ValueError(f"overlap ({overlap}) must be smaller than "
+                         f"max_chars ({max_chars})")
+    if len(text) <= max_chars:
+        return [text] if text else []
+    headings = [match.start() for match in SECTION_HEADING.finditer(text)]
+    paragraphs = [match.end() for match in PARAGRAPH_BREAK.finditer(text)]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        limit = start + max_chars
+        if limit >= len(text):
+            chunks.append(text[start:])
+            break
+        low = start + max_chars // 2
+        end = _last_boundary(headings, low, limit)
+        if end is None:
+            end = _last_boundary(paragraphs, low, limit)
+        if end is None:
+            newline = text.rfind('\n', low, limit)
+            end = newline + 1 if newline != -1 else limit
+        chunks.append(text[start:end])
+
+        next_start = end - overlap
+        newline = text.find('\n', next_start, end)
+        if newline != -1:
+            next_start = newline + 1
+        # A chunk cut short at a boundary may be shorter than the overlap;
+        # then the next one starts where it ends
+        start = next_start if next_start > start else end
+    return chunks
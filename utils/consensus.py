@@ -0,0 +1,117 @@
+import json
+import re
+from collections import Counter
+
+# Fields identifying an item of a list across extractions. Frameworks
+# are matched on organization and name, tiers on name and level (one
+# framework may reuse a name across levels), compute thresholds on value
+# and source (regimes share values such as 1e26); other items on the
+# first identity field present
+FRAMEWORK_FIELDS = ('organization', 'framework_name')
+IDENTITY_FIELDS = ('name', 'title', 'regulation', 'jurisdiction')
+
+
+def _normalize(text):
+    """Lowercase and drop punctuation, so "ASL-3" and "asl 3" agree"""
+    return re.sub(r'[^a-z0-9]+', ' ', str(text).lower()).strip()
+
+
+def _vote_key(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return _normalize(value)
+    return json.dumps(value, sort_keys=True)
+
+
+def _identity(item):
+    """Key matching a list item to its counterparts in other extractions"""
+    if not isinstance(item, dict):
+        return ('value', _vote_key(item))
+    if any(item.get(field) for field in FRAMEWORK_FIELDS):
+        return ('framework', ) + tuple(
+            _normalize(item.get(field) or '') for field in FRAMEWORK_FIELDS)
+    if item.get('tier_name') or item.get('tier_level') is not None:
+        # Unnamed tiers are matched by level alone
+        return ('tier', _normalize(item.get('tier_name') or ''),
+                _vote_key(item.get('tier_level')))
+    if item.get('threshold_flops') is not None:
+        return ('threshold', _vote_key(item['threshold_flops']),
+                _normalize(item.get('source') or item.get('regulation') or ''))
+    for field in IDENTITY_FIELDS:
+        if item.get(field):
+            return (field, _vote_key(item[field]))
+    return ('value', _vote_key(item))
+
+
+def _merge_lists(lists, min_votes, skip_nulls):
+    groups = {}
+    for source, values in enumerate(lists):
+        for item in values:
+            groups.setdefault(_identity(item), []).append((source, item))
+    merged = []
+    for members in groups.values():
+        if len({source for source, _ in members}) < min_votes:
+            continue
+        items = [item for _, item in members]
+        merged.append(_merge(items, min_votes, skip_nulls) if all(
+            isinstance(item, dict) for item in items) else items[0])
+    return merged
+
+
+def _merge_dicts(dicts, min_votes, skip_nulls):
+    keys = list(dict.fromkeys(key for d in dicts for key in d))
+    merged = {}
+    for key in keys:
+        values = [d[key] for d in dicts if key in d]
+        if len(values) >= min_votes:
+            merged[key] = _merge(values, min_votes, skip_nulls)
+    return merged
+
+
+def _merge(values, min_votes, skip_nulls=False):
+    if skip_nulls:
+        values = [value for value in values
+                  if value not in (None, '')] or values
+    if all(isinstance(value, dict) for value in values):
+        return _merge_dicts(values, min_votes, skip_nulls)
+    if all(isinstance(value, list) for value in values):
+        return _merge_lists(values, min_votes, skip_nulls)
+    # Scalars (or mixed types): majority vote, ties going to the earliest
+    # extraction
+    votes = Counter(_vote_key(value) for value in values)
+    winner = max(votes.values())
+    return next(value for value in values if votes[_vote_key(value)] == winner)
+
+
+def merge_extractions(extractions, min_votes=2):
+    """Structural majority-vote merge of JSON extractions of one document
+
+    Only what appears in at least min_votes extractions is kept: dict keys
+    present in enough of them, list items matched across enough of them
+    (frameworks by organization and name, tiers by name and level,
+    compute thresholds by value and source, plain values by normalized
+    text), recursively. Differing scalars are settled by majority, ties
+    going to the earliest extraction, so the result is reproducible.
+    """
+    extractions = [e for e in extractions if e is not None]
+    if not extractions:
+        return None
+    return _merge(extractions, min(min_votes, len(extractions)))
+
+
+def combine_partial_extractions(partials):
+    """Union of JSON extractions of different parts of one document
+
+    The counterpart of merge_extractions for chunked extraction: every
+    framework, tier and list item found in any part is kept, matched
+    across parts the same way so overlapping chunks do not duplicate
+    them. For scalars a value beats null or an empty string, then the
+    majority wins.
+    """
+    partials = [p for p in partials if p is not None]
+    if not partials:
+        return None
+    return _merge(partials, 1, skip_nulls=True)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+
+MANIFEST_PATH = 'data/processed/extraction_manifest.json'
+
+# Bump when the layout below or the way documents are extracted changes;
+# older manifests are then ignored (2: chunked instead of truncated)
+MANIFEST_FORMAT = 2
+
+
+def file_hash(path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(document_path, prompt_path, model):
+    """Everything an extraction result depends on"""
+    return {
+        'content_hash': file_hash(document_path),
+        'prompt_hash': file_hash(prompt_path),
+        'model': model,
+    }
+
+
+class ExtractionManifest:
+    """Per-document extraction results keyed by their inputs' fingerprints
+
+    For each processed output (e.g. frameworks.json) the manifest holds,
+    per raw document, the fingerprint it was last extracted under and the
+    result. A run only re-extracts documents whose fingerprint changed and
+    rebuilds the output from the stored results of the rest.
+    """
+
+    def __init__(self, root='.'):
+        self.path = os.path.join(root, MANIFEST_PATH)
+        self.outputs = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get('format') == MANIFEST_FORMAT:
+                    self.outputs = manifest['outputs']
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Unreadable extraction manifest, starting over: {e}")
+
+    def _documents(self, output):
+        return self.outputs.setdefault(output, {})
+
+    def is_current(self, output, document, document_fingerprint):
+        entry = self._documents(output).get(document)
+        return entry is not None and \
+            entry['fingerprint'] == document_fingerprint
+
+    def result(self, output, document):
+        entry = self._documents(output).get(document)
+        return None if entry is None else entry['result']
+
+    def record(self, output, document, document_fingerprint, result):
+        self._documents(output)[document] = {
+            'fingerprint': document_fingerprint,
+            'result': result,
+        }
+
+    def prune(self, output, documents):
+        """Forget documents no longer present, returning their names"""
+        entries = self._documents(output)
+        removed = sorted(set(entries) - set(documents))
+        for document in removed:
+            del entries[document]
+        return removed
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'format': MANIFEST_FORMAT, 'outputs': self.outputs},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -2,14 +2,24 @@ import os
 from openai import OpenAI
 from dotenv import load_dotenv
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.chunking import CHUNK_CHARS, CHUNK_OVERLAP, split_sections
+from utils.consensus import combine_partial_extractions, merge_extractions
+from utils.rate_limiter import estimate_tokens, shared_rate_limiter
+from utils.response_cache import cached_completion, shared_response_cache
 
 load_dotenv()
 
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Sections of one document extracted at once
+CHUNK_WORKERS = 8
+
 
 class AIExtractor:
 
-    def __init__(self):
+    def __init__(self, rate_limiter=None, cache=None):
         api_key = os.getenv('OPENAI_API_KEY')
 
         # Check if API key exists
@@ -20,13 +30,37 @@ class AIExtractor:
         # Simple client initialization (no proxies argument)
         self.client = OpenAI(api_key=api_key)
 
+        # Shared by every thread using this extractor (and, by default,
+        # every extractor in the process)
+        self.rate_limiter = rate_limiter or shared_rate_limiter()
+        self.cache = cache if cache is not None else shared_response_cache()
+
+    def _create(self, **kwargs):
+        """Chat completion text, sent once the rate limiter allows it"""
+        estimated = estimate_tokens(
+            *(message['content'] for message in kwargs['messages']))
+        self.rate_limiter.acquire(estimated)
+        response = self.client.chat.completions.create(**kwargs)
+        if response.usage is not None:
+            self.rate_limiter.record_usage(estimated,
+                                           response.usage.total_tokens)
+        return response.choices[0].message.content
+
+    def _complete(self, use_cache=True, validate=None, **kwargs):
+        """Chat completion text, from the response cache when possible"""
+        return cached_completion(self._create, self.cache, use_cache,
+                                 validate, **kwargs)
+
     def extract_structured(self,
                            document_text,
                            extraction_prompt,
-                           model="gpt-4o-mini"):
+                           model=DEFAULT_MODEL,
+                           use_cache=True):
         """Extract structured data from documents"""
         try:
-            response = self.client.chat.completions.create(
+            response = self._complete(
+                use_cache=use_cache,
+                validate=json.loads,
                 model=model,
                 messages=[{
                     "role":
@@ -41,15 +75,55 @@ class AIExtractor:
                 }],
                 response_format={"type": "json_object"},
                 temperature=0.1)
-            return json.loads(response.choices[0].message.content)
+            return json.loads(response)
         except Exception as e:
             print(f"❌ Error in extraction: {e}")
             return None
 
-    def deep_reasoning(self, question, context, model="gpt-4o-mini"):
+    def extract_chunked(self,
+                        document_text,
+                        extraction_prompt,
+                        model=DEFAULT_MODEL,
+                        max_chars=CHUNK_CHARS,
+                        overlap=CHUNK_OVERLAP,
+                        use_cache=True):
+        """Extract from a document of any length, chunk by chunk
+
+        The document is split on section boundaries (see split_sections),
+        chunks are extracted concurrently under the shared rate limiter and
+        the partial results combined into one. Returns None only if every
+        chunk failed.
+        """
+        chunks = split_sections(document_text, max_chars, overlap)
+        if len(chunks) <= 1:
+            return self.extract_structured(document_text, extraction_prompt,
+                                           model, use_cache)
+
+        print(f"🧩 Extracting {len(chunks)} sections concurrently...")
+        prompt = (f"{extraction_prompt}\n\nThe document is an excerpt of a "
+                  "longer one: extract only what this excerpt states, and "
+                  "use null or empty lists for anything it does not cover.")
+        with ThreadPoolExecutor(
+                max_workers=min(len(chunks), CHUNK_WORKERS)) as executor:
+            partials = list(
+                executor.map(
+                    lambda chunk: self.extract_structured(
+                        chunk, prompt, model, use_cache), chunks))
+
+        failed = sum(partial is None for partial in partials)
+        if failed:
+            print(f"⚠️ {failed}/{len(chunks)} sections failed to extract")
+        return combine_partial_extractions(partials)
+
+    def deep_reasoning(self,
+                       question,
+                       context,
+                       model=DEFAULT_MODEL,
+                       use_cache=True):
         """Use GPT-4 for complex reasoning (o1 models don't support some features)"""
         try:
-            response = self.client.chat.completions.create(
+            response = self._complete(
+                use_cache=use_cache,
                 model=model,
                 messages=[{
                     "role":
@@ -58,42 +132,51 @@ class AIExtractor:
                     f"Context: {context}\n\nQuestion: {question}"
                 }],
                 temperature=0.3)
-            return response.choices[0].message.content
+            return response
         except Exception as e:
             print(f"❌ Error in reasoning: {e}")
             return None
 
-    def multi_pass_extraction(self, document_text, prompts_list):
-        """Extract with multiple prompts and reconcile"""
-        extractions = []
-
-        print("🔄 Running multi-pass extraction...")
-
-        # Multiple extraction passes
-        for i, prompt in enumerate(prompts_list, 1):
-            print(f"   Pass {i}/{len(prompts_list)}...")
-            result = self.extract_structured(document_text, prompt)
-            if result:
-                extractions.append(result)
-            time.sleep(1)  # Rate limit protection
+    def multi_pass_extraction(self,
+                              document_text,
+                              prompts_list,
+                              llm_fallback=False):
+        """Extract with multiple prompts concurrently and reconcile
+
+        Passes are merged locally by majority vote (see merge_extractions),
+        keeping what at least 2 passes agree on. With llm_fallback, passes
+        that agree on nothing are reconciled by another model call instead.
+        """
+        print(f"🔄 Running {len(prompts_list)} extraction passes...")
+
+        # Passes share the rate limiter; map() keeps them in prompt order
+        workers = max(len(prompts_list), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda prompt: self.extract_structured(document_text, prompt),
+                prompts_list)
+            extractions = [result for result in results if result]
 
         print(f"✅ Completed {len(extractions)} extraction passes")
 
-        # Reconcile using another GPT call
-        if len(extractions) > 1:
-            print("🔄 Reconciling extractions...")
-            reconciliation_prompt = f"""
-            I have {len(extractions)} different extractions of the same document.
-            Please reconcile them into a single, accurate extraction.
-            Only include information that appears in at least 2 extractions.
-
-            Extractions:
-            {json.dumps(extractions, indent=2)}
-
-            Return the reconciled version as JSON.
-            """
-            final = self.extract_structured(reconciliation_prompt,
-                                            "Reconcile these extractions")
+        if len(extractions) <= 1:
+            return extractions[0] if extractions else None
+
+        final = merge_extractions(extractions)
+        if final or not llm_fallback:
             return final
 
-        return extractions[0] if extractions else None
+        # Reconcile using another GPT call
+        print("🔄 Passes disagree, reconciling with the model...")
+        reconciliation_prompt = f"""
+        I have {len(extractions)} different extractions of the same document.
+        Please reconcile them into a single, accurate extraction.
+        Only include information that appears in at least 2 extractions.
+
+        Extractions:
+        {json.dumps(extractions, indent=2)}
+
+        Return the reconciled version as JSON.
+        """
+        return self.extract_structured(reconciliation_prompt,
+                                       "Reconcile these extractions")
@@ -1,7 +1,12 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 
+from utils.chunking import split_sections
+from utils.consensus import combine_partial_extractions
+from utils.response_cache import cached_completion, shared_response_cache
+
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
 
 client = OpenAI(
@@ -22,22 +27,48 @@ AVAILABLE_MODELS = {
 
 DEFAULT_MODEL = "openai/gpt-4o-mini"
 
+# Characters per extraction call and calls in flight for one document
+CHUNK_CHARS = 15000
+CHUNK_WORKERS = 8
+
+
+def _create(**request) -> str:
+    response = client.chat.completions.create(**request)
+    return response.choices[0].message.content
+
+
+def _json_object(response: str) -> dict:
+    """The JSON object embedded in a response; ValueError if there is none"""
+    start = response.find('{')
+    end = response.rfind('}') + 1
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object in response")
+    return json.loads(response[start:end])
 
-def chat_completion(messages: list, model: str = DEFAULT_MODEL, temperature: float = 0.7, max_tokens: int = 4096) -> str:
-    """Send a chat completion request to OpenRouter"""
+
+def chat_completion(messages: list, model: str = DEFAULT_MODEL, temperature: float = 0.7, max_tokens: int = 4096, use_cache: bool = True, validate=None) -> str:
+    """Send a chat completion request to OpenRouter
+
+    Identical requests are answered from the shared response cache unless
+    use_cache is False. Responses validate rejects (by raising ValueError)
+    are not cached.
+    """
     try:
-        response = client.chat.completions.create(
+        return cached_completion(
+            _create,
+            shared_response_cache(),
+            use_cache,
+            validate,
             model=model,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
         )
-        return response.choices[0].message.content
     except Exception as e:
         raise Exception(f"OpenRouter API error: {str(e)}")
 
 
-def extract_framework_data(document_text: str, model: str = DEFAULT_MODEL) -> dict:
+def extract_framework_data(document_text: str, model: str = DEFAULT_MODEL, use_cache: bool = True) -> dict:
     """Extract structured framework data from document text using AI"""
     
     system_prompt = """You are an expert AI safety researcher. Extract structured data about AI safety frameworks from the provided document.
@@ -63,25 +94,32 @@ Return a JSON object with this structure:
 
 Be precise and only include information explicitly stated in the document. Use null for missing values."""
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": f"Extract the AI safety framework data from this document:\n\n{document_text[:15000]}"}
-    ]
-    
-    response = chat_completion(messages, model=model, temperature=0.2)
-    
-    try:
-        start = response.find('{')
-        end = response.rfind('}') + 1
-        if start != -1 and end > start:
-            return json.loads(response[start:end])
-    except json.JSONDecodeError:
-        pass
-    
-    return {"error": "Failed to parse extraction", "raw_response": response}
+    def extract(chunk: str):
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Extract the AI safety framework data from this document:\n\n{chunk}"}
+        ]
+        response = chat_completion(messages, model=model, temperature=0.2, use_cache=use_cache, validate=_json_object)
+
+        try:
+            return _json_object(response), response
+        except ValueError:
+            return None, response
+
+    # Long documents are split on section boundaries and extracted
+    # concurrently, then the partial results combined
+    chunks = split_sections(document_text, CHUNK_CHARS) or [document_text]
+    with ThreadPoolExecutor(max_workers=min(len(chunks), CHUNK_WORKERS)) as executor:
+        results = list(executor.map(extract, chunks))
+
+    combined = combine_partial_extractions([data for data, _ in results])
+    if combined is not None:
+        return combined
+
+    return {"error": "Failed to parse extraction", "raw_response": results[0][1]}
 
 
-def analyze_risk_gaps(model_specs: dict, framework_assessments: dict, model: str = DEFAULT_MODEL) -> dict:
+def analyze_risk_gaps(model_specs: dict, framework_assessments: dict, model: str = DEFAULT_MODEL, use_cache: bool = True) -> dict:
     """Analyze gaps and inconsistencies across framework assessments"""
     
     system_prompt = """You are an expert AI governance analyst. Analyze the risk assessments across multiple frameworks and identify:
@@ -113,20 +151,17 @@ Framework Assessments:
 Provide a comprehensive gap analysis."""}
     ]
     
-    response = chat_completion(messages, model=model, temperature=0.3)
+    response = chat_completion(messages, model=model, temperature=0.3, use_cache=use_cache, validate=_json_object)
     
     try:
-        start = response.find('{')
-        end = response.rfind('}') + 1
-        if start != -1 and end > start:
-            return json.loads(response[start:end])
-    except json.JSONDecodeError:
+        return _json_object(response)
+    except ValueError:
         pass
     
     return {"risk_summary": response, "error": "Failed to parse structured response"}
 
 
-def generate_compliance_report(model_name: str, assessments: dict, model: str = DEFAULT_MODEL) -> str:
+def generate_compliance_report(model_name: str, assessments: dict, model: str = DEFAULT_MODEL, use_cache: bool = True) -> str:
     """Generate a detailed compliance report in markdown format"""
     
     system_prompt = """You are an AI governance compliance officer. Generate a professional compliance report for the given AI model assessment.
@@ -151,10 +186,10 @@ Assessment Data:
 {json.dumps(assessments, indent=2)}"""}
     ]
     
-    return chat_completion(messages, model=model, temperature=0.4, max_tokens=6000)
+    return chat_completion(messages, model=model, temperature=0.4, max_tokens=6000, use_cache=use_cache)
 
 
-def explain_risk_tier(tier_name: str, framework_name: str, model: str = DEFAULT_MODEL) -> str:
+def explain_risk_tier(tier_name: str, framework_name: str, model: str = DEFAULT_MODEL, use_cache: bool = True) -> str:
     """Get an AI explanation of what a specific risk tier means"""
     
     messages = [
@@ -162,4 +197,4 @@ def explain_risk_tier(tier_name: str, framework_name: str, model: str = DEFAULT_
         {"role": "user", "content": f"Explain what {tier_name} means in the {framework_name} framework. Include what capabilities trigger this tier, what safeguards are required, and real-world implications. Keep it under 200 words."}
     ]
     
-    return chat_completion(messages, model=model, temperature=0.5, max_tokens=500)
+    return chat_completion(messages, model=model, temperature=0.5, max_tokens=500, use_cache=use_cache)
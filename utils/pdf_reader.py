@@ -41,21 +41,25 @@ def read_document(filepath):
         return None
 
 
+def list_documents(directory):
+    """Sorted names of the PDF and TXT files in directory"""
+    if not os.path.exists(directory):
+        print(f"⚠️ Directory not found: {directory}")
+        return []
+    return sorted(filename for filename in os.listdir(directory)
+                  if filename.endswith(('.pdf', '.txt')))
+
+
 def get_all_documents(directory):
     """Get all PDF and TXT files from directory"""
     documents = {}
 
-    if not os.path.exists(directory):
-        print(f"⚠️ Directory not found: {directory}")
-        return documents
-
-    for filename in os.listdir(directory):
-        if filename.endswith(('.pdf', '.txt')):
-            filepath = os.path.join(directory, filename)
-            print(f"📄 Reading {filename}...")
-            content = read_document(filepath)
-            if content:
-                documents[filename] = content
-                print(f"✅ Loaded {filename} ({len(content)} chars)")
+    for filename in list_documents(directory):
+        filepath = os.path.join(directory, filename)
+        print(f"📄 Reading {filename}...")
+        content = read_document(filepath)
+        if content:
+            documents[filename] = content
+            print(f"✅ Loaded {filename} ({len(content)} chars)")
 
     return documents
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+# Defaults sized for a low OpenAI usage tier; override with the
+# OPENAI_REQUESTS_PER_MINUTE and OPENAI_TOKENS_PER_MINUTE variables
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200000
+
+# Rough characters per token for English prose, used before a call since
+# the exact count is only known from the response
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*texts):
+    return sum(len(text) for text in texts) // CHARS_PER_TOKEN + 1
+
+
+class TokenBucket:
+    """Capacity refilled continuously at rate units per second"""
+
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity,
+                         self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount is available (0 if it is now)"""
+        self._refill(now)
+        # A request larger than the bucket waits for a full bucket
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limit
+
+    Thread-safe: every worker calls acquire() before an API request and
+    blocks until both buckets can cover it. Token use is estimated up
+    front; record_usage() settles the difference once the response
+    reports what was actually used.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        for name, rate in (('requests_per_minute', requests_per_minute),
+                           ('tokens_per_minute', tokens_per_minute)):
+            if not rate > 0:
+                raise ValueError(f"{name} must be positive, got {rate} "
+                                 "(check OPENAI_REQUESTS_PER_MINUTE and "
+                                 "OPENAI_TOKENS_PER_MINUTE)")
+        self.requests = TokenBucket(requests_per_minute,
+                                    requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            int(os.getenv('OPENAI_REQUESTS_PER_MINUTE',
+                          DEFAULT_REQUESTS_PER_MINUTE)),
+            int(os.getenv('OPENAI_TOKENS_PER_MINUTE',
+                          DEFAULT_TOKENS_PER_MINUTE)))
+
+    def acquire(self, tokens):
+        """Block until one request of about tokens tokens may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = max(self.requests.wait_time(1, now),
+                            self.tokens.wait_time(tokens, now))
+                if delay <= 0:
+                    self.requests.level -= 1
+                    self.tokens.level -= tokens
+                    return
+                self.waited += delay
+            time.sleep(delay)
+
+    def record_usage(self, estimated, actual):
+        """Charge (or refund) the gap between estimated and actual tokens"""
+        with self._lock:
+            self.tokens._refill(time.monotonic())
+            self.tokens.level -= actual - estimated
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter():
+    """Process-wide limiter configured from the environment"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RateLimiter.from_env()
+        return _shared
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Shared by every checkout entry point (app, extraction scripts), so it
+# is anchored at the repository root rather than the working directory
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data',
+                            'cache', 'llm_responses.sqlite')
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def request_key(**request):
+    """Content hash of a chat completion request
+
+    Covers everything that shapes the response: model, messages,
+    temperature, response format and output limit.
+    """
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed SQLite cache of LLM responses
+
+    Entries older than ttl seconds are ignored and purged. When the stored
+    responses exceed max_bytes, the least recently used are evicted. Safe
+    to share between threads; separate processes share it through SQLite.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False,
+                                   timeout=30)
+        with self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed "
+                             "ON responses (accessed)")
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            os.getenv('LLM_CACHE_PATH', DEFAULT_PATH),
+            float(os.getenv('LLM_CACHE_TTL', DEFAULT_TTL)),
+            int(float(os.getenv('LLM_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 2**20))
+                * 2**20))
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE key = ? AND created > ?",
+                (key, now - self.ttl)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._db:
+                self._db.execute(
+                    "UPDATE responses SET accessed = ?, hits = hits + 1 "
+                    "WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response, model=None):
+        """Store a response, then evict expired and excess entries"""
+        now = time.time()
+        size = len(response.encode())
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now))
+            self._evict(now)
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM responses WHERE created <= ?",
+                         (now - self.ttl, ))
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk entries from least to most recently used until enough
+        # bytes are freed
+        excess, stale = total - self.max_bytes, []
+        for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed"):
+            stale.append((key, ))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def discard(self, key):
+        """Remove the entry for key, if any"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key, ))
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Hit/miss counters of this process and occupancy of the cache"""
+        with self._lock:
+            entries, size, stored_hits = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+                "COALESCE(SUM(hits), 0) FROM responses").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'lifetime_hits': stored_hits,
+            }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_response_cache():
+    """Process-wide cache configured from the environment
+
+    None when LLM_CACHE=0 disables caching.
+    """
+    global _shared
+    if os.getenv('LLM_CACHE', '1') == '0':
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResponseCache.from_env()
+        return _shared
+
+
+def _is_valid(response, validate):
+    if validate is None:
+        return True
+    try:
+        validate(response)
+    except ValueError:
+        return False
+    return True
+
+
+def cached_completion(create, cache, use_cache=True, validate=None,
+                      **request):
+    """Response text of a chat completion, from cache when possible
+
+    create(**request) performs the call and returns the response text.
+    Only responses validate(response) accepts without raising ValueError
+    are stored, so a response the caller cannot use is requested again
+    next time rather than replayed; a cached entry that fails validation
+    is dropped. With use_cache=False the cache is neither read nor
+    written.
+    """
+    if cache is None or not use_cache:
+        return create(**request)
+    key = request_key(**request)
+    response = cache.get(key)
+    if response is not None and not _is_valid(response, validate):
+        cache.discard(key)
+        response = None
+    if response is None:
+        response = create(**request)
+        if response is not None and _is_valid(response, validate):
+            cache.put(key, response, request.get('model'))
+    return response